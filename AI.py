@@ -0,0 +1,140 @@
+"""
+Placement-search AI: try every reachable final placement of the current piece,
+score the resulting board with a weighted heuristic and play the best one.
+"""
+from functools import lru_cache
+
+import Engine
+import Logic
+import Rotation
+
+# Heuristic weights applied to the features of the board after a placement
+DEFAULT_WEIGHTS = {
+    "lines": 0.76,
+    "holes": -0.36,
+    "bumpiness": -0.18,
+    "height": -0.51,
+}
+GAME_OVER_PENALTY = 1e9
+
+
+def board_features(masks, columns):
+    """
+    Return (holes, bumpiness, aggregate_height) for a board given as a tuple of row masks.
+    """
+    rows = len(masks)
+    heights = [rows] * columns
+    holes = 0
+    covered = 0
+    for row, mask in enumerate(masks):
+        # Empty cells with a filled cell somewhere above them are holes.
+        holes += bin(covered & ~mask).count("1")
+        new = mask & ~covered
+        covered |= mask
+        col = 0
+        while new:
+            if new & 1:
+                heights[col] = row
+            new >>= 1
+            col += 1
+    bumpiness = sum(abs(heights[col] - heights[col + 1]) for col in range(columns - 1))
+    aggregate_height = sum(rows - height for height in heights)
+    return holes, bumpiness, aggregate_height
+
+
+class PlacementAI:
+    """
+    Enumerates placements reachable by rotating right, shifting sideways and hard dropping.
+    Board evaluations are memoised in an LRU cache keyed by the board's row masks.
+    """
+
+    def __init__(self, weights=None, cache_size=65536):
+        self.weights = dict(DEFAULT_WEIGHTS)
+        if weights:
+            self.weights.update(weights)
+        self.features = lru_cache(maxsize=cache_size)(board_features)
+
+    def evaluate(self, board, lines):
+        # The empty rows above the stack do not change the features, so only the stack is looked at.
+        top = min(board.heights)
+        holes, bumpiness, height = self.features(tuple(board.row_masks[top:]), board.columns)
+        w = self.weights
+        return w["lines"] * lines + w["holes"] * holes + w["bumpiness"] * bumpiness + w["height"] * height
+
+    def placements(self, engine):
+        """
+        Yield (actions, cells, lines, value) for every reachable final placement of the active piece.
+        """
+        entries = engine.rotation_table.get(engine.current_piece_shape)
+        if not entries or not engine.active_piece_grid_pos:
+            return
+        board = engine.board
+        collides = board.collides
+        rotation = engine.current_rotation_index
+        pivot_col, pivot_row = engine.rotation_origin
+        offsets = engine.rotations[engine.current_piece_shape][rotation]
+        turns = []
+        for _ in range(len(entries)):
+            if not turns:
+                turns.append(())
+            else:
+                # Rotate right with the same kicks as the engine; stop when it is blocked.
+                next_idx, candidates = entries[rotation][Rotation.RIGHT]
+                for kx, ky, kicked in candidates:
+                    if not collides([(pivot_col + dx, pivot_row + dy) for dx, dy in kicked]):
+                        rotation = next_idx
+                        pivot_col += kx
+                        pivot_row += ky
+                        offsets = engine.rotations[engine.current_piece_shape][rotation]
+                        break
+                else:
+                    break
+                turns.append(turns[-1] + (Engine.ROTATE_RIGHT,))
+            yield from self._shifts(board, offsets, pivot_col, pivot_row, turns[-1])
+
+    def _shifts(self, board, offsets, pivot_col, pivot_row, turns):
+        cells = [(pivot_col + dx, pivot_row + dy) for dx, dy in offsets]
+        yield self._drop(board, cells, turns)
+        for direction, action in ((-1, Engine.LEFT), (1, Engine.RIGHT)):
+            shift = direction
+            moves = (action,)
+            while True:
+                cells = [(pivot_col + shift + dx, pivot_row + dy) for dx, dy in offsets]
+                if board.collides(cells):
+                    break
+                yield self._drop(board, cells, turns + moves)
+                shift += direction
+                moves += (action,)
+
+    def _drop(self, board, cells, actions):
+        distance = board.drop_distance(cells)
+        if distance is None:
+            distance = 0
+            while not board.collides([(c, r + distance + 1) for c, r in cells]):
+                distance += 1
+        cells = [(c, r + distance) for c, r in cells]
+        trial = board.copy()
+        full_rows = trial.lock(cells)
+        lines = Logic.clear_full_rows(trial, full_rows)
+        value = self.evaluate(trial, lines)
+        if trial.row_masks[0] or trial.row_masks[1]:
+            # Locking into the top rows ends the game; only pick this when nothing else fits.
+            value -= GAME_OVER_PENALTY
+        return actions + (Engine.DROP,), cells, lines, value
+
+    def best_placement(self, engine):
+        """
+        Return the highest scoring (actions, cells, lines, value), or None without an active piece.
+        """
+        best = None
+        for placement in self.placements(engine):
+            if best is None or placement[3] > best[3]:
+                best = placement
+        return best
+
+    def plan(self, engine):
+        """
+        Return the list of engine actions that plays the best placement.
+        """
+        best = self.best_placement(engine)
+        return list(best[0]) if best is not None else []
@@ -0,0 +1,304 @@
+"""
+Seekable multi-game replay archive.
+
+One file holds many recorded games. Each game stores its seed, board size and
+(tick, action) stream like a `Replay`, plus an `Engine.snapshot` keyframe every
+`keyframe_interval` actions. Seeking to a tick restores the nearest keyframe
+before it and replays at most `keyframe_interval - 1` actions. Every game refers
+to the grid config and block rotations it was played with, stored in the file,
+so archives stay readable when the defaults change. Archives are read through
+`mmap` and only the parts of a game that are used are touched:
+
+    python Archive.py pack games.tta *.ttr
+    python Archive.py info games.tta
+    python Archive.py seek games.tta 12 3600
+
+Layout: header, game records, then the game index and the config table.
+"""
+import argparse
+import bisect
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+import Engine
+import Game
+import Replay
+
+MAGIC = b"TTRA"
+VERSION = 1
+
+# magic, version, game count, config count, index offset
+HEADER = struct.Struct("<4sBIIQ")
+# seed, rows, columns, config id, reserved, action count, keyframe interval, keyframe count
+RECORD = struct.Struct("<qHHHHIII")
+# record offset, action count, last tick, score, lines, pieces
+INDEX = struct.Struct("<QIIIII")
+CONFIG_SIZE = struct.Struct("<I")
+
+DEFAULT_KEYFRAME_INTERVAL = 256
+# Records start on 8-byte boundaries so their tick arrays are aligned.
+ALIGN = 8
+
+
+def config_bytes(config, rotations):
+    """
+    Encode a grid config and rotation set as compact JSON; equal configs share one table entry.
+    Keys keep their order, since the order of the shapes decides the piece sequence.
+    """
+    data = {"grid": config, "block_rotations": rotations}
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+def decode_config(data):
+    """
+    Return the (grid config, block rotations) stored by `config_bytes`, with offsets as tuples.
+    """
+    data = json.loads(bytes(data))
+    rotations = {shape: [[tuple(offset) for offset in pattern] for pattern in patterns]
+                 for shape, patterns in data["block_rotations"].items()}
+    return data["grid"], rotations
+
+
+class ArchiveWriter:
+    """
+    Append games to a new archive; the index is written by `close`.
+    """
+
+    def __init__(self, path, keyframe_interval=DEFAULT_KEYFRAME_INTERVAL):
+        self.file = open(path, "wb")
+        self.keyframe_interval = keyframe_interval
+        self.index = []
+        self.configs = {}
+        self.file.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+        self._pad()
+
+    def _pad(self):
+        offset = self.file.tell()
+        self.file.write(b"\0" * (-offset % ALIGN))
+
+    def add(self, replay, config=None, rotations=None):
+        """
+        Add a game from a `Replay` or `Recorder` and return its index in the archive.
+        `config` defaults to `Game.make_grid` for its size and `rotations` to `Engine.block_rotations`.
+        """
+        if config is None:
+            config = Game.make_grid(replay.rows, replay.columns)
+        if rotations is None:
+            rotations = Engine.block_rotations
+        key = config_bytes(config, rotations)
+        config_id = self.configs.setdefault(key, len(self.configs))
+
+        # Play the game once to take the keyframes and the final result.
+        engine = Engine.Engine(replay.seed, replay.rows, replay.columns, rotations)
+        interval = self.keyframe_interval
+        actions = replay.actions
+        keyframes = []
+        for i, action in enumerate(actions):
+            if i % interval == 0:
+                keyframes.append(engine.snapshot())
+            engine.step(action)
+        if len(actions) % interval == 0:
+            keyframes.append(engine.snapshot())
+
+        ticks = array("I", replay.ticks)
+        if sys.byteorder != "little":
+            ticks.byteswap()
+        f = self.file
+        offset = f.tell()
+        f.write(RECORD.pack(replay.seed, replay.rows, replay.columns, config_id, 0, len(actions),
+                            interval, len(keyframes)))
+        f.write(ticks.tobytes())
+        f.write(bytes(actions))
+        f.write(b"".join(keyframes))
+        self._pad()
+        last_tick = replay.ticks[-1] if len(actions) else 0
+        self.index.append(INDEX.pack(offset, len(actions), last_tick, engine.score, engine.lines, engine.pieces))
+        return len(self.index) - 1
+
+    def close(self):
+        f = self.file
+        index_offset = f.tell()
+        f.write(b"".join(self.index))
+        for key in self.configs:
+            f.write(CONFIG_SIZE.pack(len(key)))
+            f.write(key)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, len(self.index), len(self.configs), index_offset))
+        f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ArchivedGame:
+    """
+    One game of an `Archive`. `ticks` and `actions` are views into the mapped file.
+    """
+
+    def __init__(self, archive, number, offset, last_tick, score, lines, pieces):
+        data = archive.data
+        (self.seed, self.rows, self.columns, config_id, _, count, self.keyframe_interval,
+         keyframe_count) = RECORD.unpack_from(data, offset)
+        self.number = number
+        self.last_tick = last_tick
+        self.score = score
+        self.lines = lines
+        self.pieces = pieces
+        self.config, self.rotations = archive.config(config_id)
+        start = offset + RECORD.size
+        self.ticks = data[start:start + 4 * count].cast("I")
+        if sys.byteorder != "little":
+            self.ticks = array("I", self.ticks)
+            self.ticks.byteswap()
+        start += 4 * count
+        self.actions = data[start:start + count]
+        start += count
+        self.keyframe_size = Engine.SNAPSHOT_HEADER.size + (self.rows * self.columns + 7) // 8
+        self._keyframes = start
+        self.keyframe_count = keyframe_count
+        self._data = data
+
+    def __len__(self):
+        return len(self.actions)
+
+    def new_engine(self):
+        return Engine.Engine(self.seed, self.rows, self.columns, self.rotations)
+
+    def keyframe(self, k):
+        """
+        Return the snapshot taken before action `k * keyframe_interval`.
+        """
+        start = self._keyframes + k * self.keyframe_size
+        return self._data[start:start + self.keyframe_size]
+
+    def replay(self):
+        """
+        Return the game as a `Replay`, copied out of the archive.
+        """
+        return Replay.Replay(self.seed, self.rows, self.columns, array("I", self.ticks), array("B", self.actions))
+
+    def seek(self, tick, engine=None):
+        """
+        Return an engine in the state after every action recorded at or before `tick`.
+        Pass an `engine` of the same size and rotations to restore it in place.
+        """
+        if engine is None:
+            engine = self.new_engine()
+        index = bisect.bisect_right(self.ticks, tick)
+        k = min(index // self.keyframe_interval, self.keyframe_count - 1)
+        engine.restore(self.keyframe(k))
+        step = engine.step
+        for action in self.actions[k * self.keyframe_interval:index]:
+            step(action)
+        return engine
+
+
+class Archive:
+    """
+    Read-only, memory-mapped view of an archive written by `ArchiveWriter`.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.data = memoryview(self._mmap)
+        magic, version, self.count, config_count, index_offset = HEADER.unpack_from(self.data)
+        if magic != MAGIC:
+            raise ValueError("not a Tootris archive")
+        if version != VERSION:
+            raise ValueError(f"unsupported archive version {version}")
+        self.index_offset = index_offset
+        # Config table entries are decoded once, on first use, so engines share rotation tables.
+        self._config_offsets = []
+        offset = index_offset + self.count * INDEX.size
+        for _ in range(config_count):
+            (size,) = CONFIG_SIZE.unpack_from(self.data, offset)
+            self._config_offsets.append((offset + CONFIG_SIZE.size, size))
+            offset += CONFIG_SIZE.size + size
+        self._configs = {}
+
+    def config(self, config_id):
+        """
+        Return the (grid config, block rotations) of a config table entry.
+        """
+        config = self._configs.get(config_id)
+        if config is None:
+            start, size = self._config_offsets[config_id]
+            config = self._configs[config_id] = decode_config(self.data[start:start + size])
+        return config
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, number):
+        if not 0 <= number < self.count:
+            raise IndexError("archive game out of range")
+        entry = INDEX.unpack_from(self.data, self.index_offset + number * INDEX.size)
+        offset, _, last_tick, score, lines, pieces = entry
+        return ArchivedGame(self, number, offset, last_tick, score, lines, pieces)
+
+    def __iter__(self):
+        return (self[number] for number in range(self.count))
+
+    def seek(self, number, tick, engine=None):
+        return self[number].seek(tick, engine)
+
+    def close(self):
+        try:
+            self.data.release()
+            self._mmap.close()
+        except BufferError:
+            # Games still hold views into the file; it is unmapped once they are freed.
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pack, list and seek Tootris replay archives.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    pack = commands.add_parser("pack", help="pack replay files into a new archive")
+    pack.add_argument("archive")
+    pack.add_argument("replays", nargs="+")
+    pack.add_argument("--keyframe-interval", type=int, default=DEFAULT_KEYFRAME_INTERVAL)
+    info = commands.add_parser("info", help="print one JSON line per game")
+    info.add_argument("archive")
+    seek = commands.add_parser("seek", help="print the game state at a tick")
+    seek.add_argument("archive")
+    seek.add_argument("game", type=int)
+    seek.add_argument("tick", type=int)
+    args = parser.parse_args(argv)
+
+    if args.command == "pack":
+        with ArchiveWriter(args.archive, args.keyframe_interval) as writer:
+            for path in args.replays:
+                writer.add(Replay.Replay.load(path))
+        print(json.dumps({"archive": args.archive, "games": len(args.replays)}))
+    elif args.command == "info":
+        with Archive(args.archive) as archive:
+            for game in archive:
+                print(json.dumps({"game": game.number, "seed": game.seed, "rows": game.rows,
+                                  "columns": game.columns, "actions": len(game), "ticks": game.last_tick,
+                                  "score": game.score, "lines": game.lines, "pieces": game.pieces}))
+    else:
+        with Archive(args.archive) as archive:
+            engine = archive.seek(args.game, args.tick)
+            result = {"game": args.game, "tick": args.tick, "score": engine.score, "lines": engine.lines,
+                      "pieces": engine.pieces, "game_over": engine.game_over,
+                      "active": engine.active_piece_grid_pos, "board": engine.board.cells()}
+            print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+"""
+Benchmarks for the game logic and render hot paths.
+
+    python Bench.py --output bench.json
+    python Bench.py --compare bench.json
+
+Results are written as JSON so runs from different commits can be compared.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+import Engine
+import Logic
+import Selfplay
+from Board import Board
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+def measure(func, number, repeat=5):
+    """
+    Call `func` `number` times per run and return the best run time per call in seconds.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best / number
+
+
+def filled_cells(rows, columns, height, full_rows=0, seed=0):
+    """
+    Return locked cells for a board stacked `height` rows high.
+    Every stacked row has one hole except `full_rows` randomly chosen complete rows.
+    """
+    rng = random.Random(seed)
+    stacked = list(range(rows - height, rows))
+    complete = set(rng.sample(stacked, min(full_rows, len(stacked))))
+    cells = []
+    for row in stacked:
+        hole = None if row in complete else rng.randrange(columns)
+        cells.extend((col, row) for col in range(columns) if col != hole)
+    return cells
+
+
+def engine_with_stack(height, seed=0, rows=None, columns=None):
+    engine = Engine.Engine(seed, rows, columns)
+    engine.board.set_cells(filled_cells(engine.rows, engine.columns, height, seed=seed))
+    engine.spawn("T")
+    return engine
+
+
+@benchmark("check_full_rows")
+def bench_check_full_rows():
+    results = {}
+    rows, columns = Engine.grid["rows"], Engine.grid["columns"]
+    for height, full in ((4, 1), (10, 2), (16, 4)):
+        cells = filled_cells(rows, columns, height, full)
+        results[f"list_h{height}_full{full}"] = measure(
+            lambda: Logic.check_full_rows(cells, rows, columns), 2000)
+
+        board = Board(rows, columns)
+
+        def board_clear():
+            board.set_cells(cells)
+            Logic.clear_full_rows(board)
+        results[f"board_h{height}_full{full}"] = measure(board_clear, 2000)
+
+        try:
+            import numpy as np
+        except ImportError:
+            continue
+        occupancy = np.zeros((rows, columns), dtype=bool)
+        for col, row in cells:
+            occupancy[row, col] = True
+        results[f"numpy_h{height}_full{full}"] = measure(
+            lambda: Logic.check_full_rows_array(occupancy), 2000)
+    return results
+
+
+@benchmark("can_move_and_drop")
+def bench_can_move_and_drop():
+    results = {}
+    for height in (0, 5, 10, 15):
+        engine = engine_with_stack(height)
+        results[f"can_move_h{height}"] = measure(lambda: engine._can_move(0, 1), 20000)
+
+        def drop():
+            engine.spawn("T")
+            engine._apply_move(0, engine.drop_distance())
+        results[f"drop_h{height}"] = measure(drop, 2000)
+    return results
+
+
+@benchmark("rotation")
+def bench_rotation():
+    results = {}
+    for height in (0, 10, 15):
+        engine = engine_with_stack(height)
+        results[f"rotate_h{height}"] = measure(engine.rotate_right, 20000)
+        # Squeeze the piece against the wall so the kick candidates get walked.
+        engine.spawn("I")
+        while engine.move_left():
+            pass
+
+        def rotate_at_wall():
+            engine.rotate_right()
+            engine.rotate_right()
+        results[f"rotate_kick_h{height}"] = measure(rotate_at_wall, 10000)
+    return results
+
+
+@benchmark("game_loop")
+def bench_game_loop():
+    results = {}
+    for policy in ("random", "greedy"):
+        ticks = 0
+        start = time.perf_counter()
+        for seed in range(50):
+            ticks += Selfplay.play_game(seed, policy, 20000)["ticks"]
+        results[f"{policy}_per_tick"] = (time.perf_counter() - start) / ticks
+    return results
+
+
+@benchmark("board_size")
+def bench_board_size():
+    """
+    Per-tick scheduler cost, hard drop with a line clear and AI planning on growing boards.
+    These should stay nearly flat: logic only touches the rows a piece is in.
+    """
+    import AI
+    import Scheduler
+    results = {}
+    for rows, columns in ((20, 10), (200, 50), (1000, 100)):
+        engine = engine_with_stack(10, rows=rows, columns=columns)
+        controller = Scheduler.Controller(engine)
+
+        def tick():
+            if engine.game_over:
+                engine.reset(0)
+            controller.run_tick()
+        results[f"tick_{columns}x{rows}"] = measure(tick, 20000)
+
+        board = engine.board
+        bottom_row = [(col, rows - 1) for col in range(columns)]
+
+        def lock_and_clear():
+            Logic.clear_full_rows(board, board.lock(bottom_row))
+        results[f"lock_clear_{columns}x{rows}"] = measure(lock_and_clear, 5000)
+
+        ai = AI.PlacementAI()
+        engine = engine_with_stack(10, rows=rows, columns=columns)
+        results[f"ai_plan_{columns}x{rows}"] = measure(lambda: ai.plan(engine), 20)
+    return results
+
+
+@benchmark("vecenv")
+def bench_vecenv():
+    """
+    Board steps per second of the batched NumPy simulator with random actions; skipped without NumPy.
+    """
+    try:
+        import numpy as np
+        import VecEnv
+    except ImportError as e:
+        return {"skipped": f"{type(e).__name__}: {e}"}
+    results = {}
+    rng = np.random.default_rng(0)
+    for n in (256, 4096, 16384):
+        env = VecEnv.VecEnv(n, seed=0)
+        actions = rng.choice(np.array(Engine.ACTIONS), size=(64, n))
+        steps = iter(range(1 << 62))
+
+        def step():
+            env.step(actions[next(steps) % len(actions)])
+        # Seconds per board step, comparable with the per-tick figures of game_loop
+        results[f"step_n{n}"] = measure(step, 20) / n
+    return results
+
+
+@benchmark("env")
+def bench_env():
+    """
+    Seconds per `Env.step` with random actions, including the observation update; skipped without NumPy.
+    """
+    try:
+        import Env
+    except ImportError as e:
+        return {"skipped": f"{type(e).__name__}: {e}"}
+    env = Env.Env(0)
+    rng = random.Random(0)
+    actions = [rng.choice(Engine.ACTIONS) for _ in range(1024)]
+    steps = iter(range(1 << 62))
+
+    def step():
+        if env.step(actions[next(steps) % len(actions)])[2]:
+            env.reset()
+    return {"step": measure(step, 20000)}
+
+
+@benchmark("raster")
+def bench_raster():
+    """
+    Seconds per software-rendered frame while playing random actions, and per PNG encode; skipped without NumPy.
+    """
+    try:
+        import Raster
+    except ImportError as e:
+        return {"skipped": f"{type(e).__name__}: {e}"}
+    engine = Engine.Engine(0)
+    rasterizer = Raster.Rasterizer()
+    rng = random.Random(0)
+
+    def frame():
+        engine.step(rng.choice(Engine.ACTIONS))
+        if engine.game_over:
+            engine.reset()
+        rasterizer.render(engine)
+    results = {"frame": measure(frame, 2000)}
+    results["png"] = measure(lambda: Raster.png_bytes(rasterizer.frame), 10)
+    return results
+
+
+@benchmark("archive")
+def bench_archive():
+    """
+    Seconds to seek to a random tick of a random game in an archive of recorded random games.
+    """
+    import tempfile
+    import Archive
+    import Replay
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.tta")
+        with Archive.ArchiveWriter(path) as writer:
+            for seed in range(200):
+                engine = Engine.Engine(seed)
+                recorder = Replay.Recorder(seed, engine.rows, engine.columns)
+                tick = 0
+                while not engine.game_over and tick < 5000:
+                    tick += 1
+                    action = rng.choice(Engine.ACTIONS)
+                    recorder.record(tick, action)
+                    engine.step(action)
+                writer.add(recorder)
+        archive = Archive.Archive(path)
+
+        def seek():
+            game = archive[rng.randrange(len(archive))]
+            game.seek(rng.randrange(game.last_tick + 1))
+        results = {"seek": measure(seek, 500)}
+        archive.close()
+    return results
+
+
+# Modules timed by the import benchmark; only Views may pull in arcade and pyglet.
+IMPORT_MODULES = ("Board", "Logic", "Engine", "Scoreboard", "Scheduler", "Replay", "AI", "Selfplay", "Versus", "VecEnv",
+                  "Env", "Raster", "Archive", "Game", "Views")
+
+IMPORT_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed, int("arcade" in sys.modules or "pyglet" in sys.modules))
+"""
+
+
+@benchmark("import")
+def bench_import():
+    """
+    Time a cold import of each module in a fresh interpreter and note whether it loaded graphics.
+    """
+    results = {}
+    here = os.path.dirname(os.path.abspath(__file__))
+    for module in IMPORT_MODULES:
+        best = None
+        for _ in range(5):
+            proc = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT.format(module=module)], cwd=here,
+                                  capture_output=True, text=True)
+            if proc.returncode != 0:
+                error = proc.stderr.strip().splitlines()
+                results[f"{module}_skipped"] = error[-1] if error else f"exit code {proc.returncode}"
+                break
+            elapsed, graphics = proc.stdout.split()
+            if best is None or float(elapsed) < best:
+                best = float(elapsed)
+        else:
+            results[module] = best
+            results[f"{module}_graphics"] = graphics == "1"
+    return results
+
+
+@benchmark("render")
+def bench_render():
+    """
+    Draw frames of the game view into a hidden window; skipped when no display is available.
+    """
+    try:
+        import arcade
+        import Game
+        window = arcade.Window(Game.WINDOW_WIDTH, Game.WINDOW_HEIGHT, Game.WINDOW_TITLE, visible=False)
+    except Exception as e:
+        return {"skipped": f"{type(e).__name__}: {e}"}
+    game = Game.TootrisGame(seed=0)
+    game.engine.board.set_cells(filled_cells(game.engine.rows, game.engine.columns, 12))
+    window.show_view(game)
+
+    def frame():
+        game.on_draw()
+        window.ctx.finish()
+    results = {"frame": measure(frame, 200)}
+    window.close()
+    return results
+
+
+def run(names=None):
+    results = {}
+    for name, func in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        results[name] = func()
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"commit": commit, "python": sys.version.split()[0], "platform": platform.platform()}
+
+
+def compare(baseline, current):
+    """
+    Print current/baseline timing ratios; below 1.0 means faster than the baseline.
+    """
+    for name, results in current["results"].items():
+        base = baseline["results"].get(name, {})
+        for case, seconds in results.items():
+            before = base.get(case)
+            if not isinstance(seconds, float) or not isinstance(before, float):
+                continue
+            print(f"{name}.{case:<28} {before * 1e6:12.3f} us -> {seconds * 1e6:12.3f} us  x{seconds / before:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Tootris benchmarks.")
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--output", "-o", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON file from an earlier run")
+    args = parser.parse_args(argv)
+
+    report = {"environment": environment(), "results": run(args.names)}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
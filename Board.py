@@ -0,0 +1,294 @@
+from functools import lru_cache
+
+
+@lru_cache(maxsize=4096)
+def row_bytes(mask, columns):
+    """
+    Return a row mask as `columns` bytes, 1 for an occupied cell and 0 for an empty one.
+    """
+    return bytes((mask >> col) & 1 for col in range(columns))
+
+
+class Board:
+    """
+    Locked cells of the playfield stored as one integer bitmask per row.
+    Bit `col` of `row_masks[row]` is set when the cell (col, row) is occupied.
+    `heights[col]` is the topmost occupied row of each column, or `rows` when it is empty.
+
+    `version` goes up on every change, so callers can cache what they derive from the board.
+    `enable_cell_buffer` additionally keeps one byte per cell in a fixed bytearray,
+    row-major, for consumers that want a zero-copy array view of the board.
+    """
+
+    def __init__(self, rows, columns):
+        self.rows = rows
+        self.columns = columns
+        self.full_mask = (1 << columns) - 1
+        self.row_masks = [0] * rows
+        self.heights = [rows] * columns
+        self.version = 0
+        self.cell_buffer = None
+
+    def enable_cell_buffer(self):
+        """
+        Start keeping `cell_buffer` in sync with the board and return it.
+        The bytearray is never resized, so views over it stay valid.
+        """
+        if self.cell_buffer is None:
+            self.cell_buffer = bytearray(self.rows * self.columns)
+            self._sync_cells(0, self.rows)
+        return self.cell_buffer
+
+    def _sync_cells(self, start, stop):
+        """
+        Rewrite rows `start` to `stop` of the cell buffer from the row masks.
+        """
+        buf = self.cell_buffer
+        if buf is None:
+            return
+        columns = self.columns
+        masks = self.row_masks
+        for row in range(start, stop):
+            buf[row * columns:(row + 1) * columns] = row_bytes(masks[row], columns)
+
+    def clear(self):
+        """
+        Empty the board in place.
+        """
+        self.version += 1
+        masks = self.row_masks
+        for row in range(self.rows):
+            masks[row] = 0
+        heights = self.heights
+        for col in range(self.columns):
+            heights[col] = self.rows
+        if self.cell_buffer is not None:
+            self.cell_buffer[:] = bytes(len(self.cell_buffer))
+
+    def copy(self):
+        board = Board.__new__(Board)
+        board.rows = self.rows
+        board.columns = self.columns
+        board.full_mask = self.full_mask
+        board.row_masks = self.row_masks[:]
+        board.heights = self.heights[:]
+        board.version = 0
+        board.cell_buffer = None
+        return board
+
+    def is_occupied(self, col, row):
+        return (self.row_masks[row] >> col) & 1 == 1
+
+    def collides(self, cells):
+        """
+        Return True if any (col, row) cell is out of bounds or already occupied.
+        """
+        rows = self.rows
+        columns = self.columns
+        masks = self.row_masks
+        for col, row in cells:
+            if col < 0 or col >= columns or row < 0 or row >= rows:
+                return True
+            if (masks[row] >> col) & 1:
+                return True
+        return False
+
+    def lock(self, cells):
+        """
+        Mark the given cells as occupied and return the sorted list of rows they completed.
+        Only the rows touched by the cells are checked.
+        """
+        self.version += 1
+        masks = self.row_masks
+        heights = self.heights
+        touched = set()
+        for col, row in cells:
+            masks[row] |= 1 << col
+            touched.add(row)
+            if row < heights[col]:
+                heights[col] = row
+        buf = self.cell_buffer
+        if buf is not None:
+            for col, row in cells:
+                buf[row * self.columns + col] = 1
+        full = self.full_mask
+        return sorted(row for row in touched if masks[row] == full)
+
+    def full_rows(self):
+        full = self.full_mask
+        return [row for row, mask in enumerate(self.row_masks) if mask == full]
+
+    def clear_full_rows(self, full_rows=None):
+        """
+        Remove every full row, shift the rows above it down and return the number removed.
+        `full_rows` may be passed when the caller already knows them, e.g. from `lock`.
+        """
+        if full_rows is None:
+            full_rows = self.full_rows()
+        if not full_rows:
+            return 0
+        self.version += 1
+        masks = self.row_masks
+        top = min(self.heights)
+        for row in sorted(full_rows, reverse=True):
+            del masks[row]
+        masks[0:0] = [0] * len(full_rows)
+        self._update_heights(full_rows)
+        # Only rows from the old stack top down to the lowest cleared row moved.
+        self._sync_cells(top, max(full_rows) + 1)
+        return len(full_rows)
+
+    def _update_heights(self, cleared):
+        """
+        Move each column height past the cleared rows; rescan only columns whose top cell was cleared.
+        """
+        rows = self.rows
+        masks = self.row_masks
+        cleared = set(cleared)
+        for col, height in enumerate(self.heights):
+            if height == rows:
+                continue
+            row = height + sum(1 for r in cleared if r > height)
+            if height in cleared:
+                bit = 1 << col
+                while row < rows and not masks[row] & bit:
+                    row += 1
+            self.heights[col] = row
+
+    def add_garbage(self, count, hole):
+        """
+        Push `count` garbage rows, full except for column `hole`, in from the bottom.
+        Return True if occupied rows were pushed out of the top.
+        """
+        self.version += 1
+        rows = self.rows
+        count = min(count, rows)
+        masks = self.row_masks
+        overflow = any(masks[:count])
+        del masks[:count]
+        masks.extend([self.full_mask & ~(1 << hole)] * count)
+        self._sync_cells(0, rows)
+        if overflow:
+            self._recompute_heights()
+            return True
+        heights = self.heights
+        for col, height in enumerate(heights):
+            if height < rows:
+                heights[col] = height - count
+            elif col != hole:
+                heights[col] = rows - count
+        return False
+
+    def update_rows(self, changes):
+        """
+        Set the mask of each (row, mask) pair in `changes`, e.g. from a network delta.
+        """
+        self.version += 1
+        masks = self.row_masks
+        for row, mask in changes:
+            masks[row] = mask
+        self._recompute_heights()
+        self._sync_cells(0, self.rows)
+
+    def drop_distance(self, cells):
+        """
+        Return how many rows the cells can fall before landing, using the column heights.
+        Return None if a cell is below its column's surface (e.g. tucked under an overhang).
+        """
+        heights = self.heights
+        distance = self.rows
+        for col, row in cells:
+            height = heights[col]
+            if row >= height:
+                return None
+            if height - row - 1 < distance:
+                distance = height - row - 1
+        return distance
+
+    def cells(self):
+        """
+        Return all occupied cells as a list of (col, row) tuples, top row first.
+        """
+        result = []
+        for row, mask in enumerate(self.row_masks):
+            col = 0
+            while mask:
+                if mask & 1:
+                    result.append((col, row))
+                mask >>= 1
+                col += 1
+        return result
+
+    def set_cells(self, cells):
+        """
+        Replace the board contents with the given (col, row) cells.
+        """
+        self.clear()
+        self.version += 1
+        masks = self.row_masks
+        heights = self.heights
+        for col, row in cells:
+            masks[row] |= 1 << col
+            if row < heights[col]:
+                heights[col] = row
+        self._sync_cells(0, self.rows)
+
+    def to_bytes(self):
+        """
+        Pack the whole board into ceil(rows * columns / 8) bytes, row 0 in the lowest bits.
+        """
+        columns = self.columns
+        value = 0
+        for row, mask in enumerate(self.row_masks):
+            value |= mask << (row * columns)
+        return value.to_bytes(self.byte_size(), "little")
+
+    def byte_size(self):
+        return (self.rows * self.columns + 7) // 8
+
+    def load_bytes(self, data):
+        """
+        Restore the board in place from `to_bytes` output.
+        """
+        self.version += 1
+        value = int.from_bytes(data, "little")
+        columns = self.columns
+        full = self.full_mask
+        masks = self.row_masks
+        for row in range(self.rows):
+            masks[row] = value & full
+            value >>= columns
+        self._recompute_heights()
+        self._sync_cells(0, self.rows)
+
+    def _recompute_heights(self):
+        heights = self.heights
+        for col in range(self.columns):
+            heights[col] = self.rows
+        seen = 0
+        full = self.full_mask
+        for row, mask in enumerate(self.row_masks):
+            new = mask & ~seen
+            if not new:
+                continue
+            seen |= new
+            col = 0
+            while new:
+                if new & 1:
+                    heights[col] = row
+                new >>= 1
+                col += 1
+            if seen == full:
+                break
+
+    def __len__(self):
+        return sum(bin(mask).count("1") for mask in self.row_masks)
+
+    def __iter__(self):
+        return iter(self.cells())
+
+    def __contains__(self, cell):
+        col, row = cell
+        if col < 0 or col >= self.columns or row < 0 or row >= self.rows:
+            return False
+        return self.is_occupied(col, row)
@@ -0,0 +1,396 @@
+import random
+import struct
+
+import Logic
+import Rotation
+import Trace
+from Board import Board
+
+# Grid dimensions and layout
+grid = {
+    "rows": 20,
+    "columns": 10,
+    "cell_size": 36,
+    "margin": 5,
+    "top_offset": 50,
+    "left_offset": 50,
+}
+
+# Block presets defined as local offsets (col_offset, row_offset) from an origin
+block_presets = {
+    "I": [(0, 0), (-1, 0), (-2, 0), (1, 0)],
+    "O": [(0, 0), (1, 0), (0, 1), (1, 1)],
+    "T": [(0, 0), (1, 0), (2, 0), (1, 1)],
+    "S": [(1, 0), (2, 0), (0, 1), (1, 1)],
+}
+
+block_rotations = {
+    "I": [ [(0,0), (-1,0), (-2,0), (1,0)],
+           [(0,0), (0,-1), (0,-2), (0,1)] ],
+    "O": [ [(0,0), (1,0), (0,1), (1,1)] ],
+    "T": [ [(0,0), (1,0), (2,0), (1,1)],
+           [(1,0), (1,1), (1,2), (0,1)],
+           [(0,1), (1,1), (2,1), (1,0)],
+           [(1,0), (1,1), (1,2), (2,1)] ],
+    "S": [ [(1,0), (2,0), (0,1), (1,1)],
+           [(0,0), (0,1), (1,1), (1,2)] ],
+}
+
+# Actions accepted by `Engine.step`
+NOOP = 0
+LEFT = 1
+RIGHT = 2
+DOWN = 3
+ROTATE_LEFT = 4
+ROTATE_RIGHT = 5
+DROP = 6
+# Replace the active piece with a freshly spawned one; not part of normal play.
+SPAWN = 7
+ACTIONS = (NOOP, LEFT, RIGHT, DOWN, ROTATE_LEFT, ROTATE_RIGHT, DROP)
+
+MASK64 = (1 << 64) - 1
+
+# Snapshot header: shape index, rotation index, pivot col and row, game over,
+# score, lines, pieces, ticks, RNG state. The packed board follows it.
+SNAPSHOT_HEADER = struct.Struct("<BbhhBIIIIQ")
+NO_PIECE = 255
+
+
+class Engine:
+    """
+    Headless game rules: spawning, movement, rotation with kicks, locking and scoring.
+    Has no dependency on arcade or pyglet so games can be stepped without a window.
+    """
+
+    def __init__(self, seed=None, rows=None, columns=None, rotations=None):
+        self.rows = grid["rows"] if rows is None else rows
+        self.columns = grid["columns"] if columns is None else columns
+        self.rotations = block_rotations if rotations is None else rotations
+        self.shapes = list(self.rotations.keys())
+        self.rotation_table = Rotation.rotation_table(self.rotations)
+        self.shape_index = {shape: idx for idx, shape in enumerate(self.shapes)}
+
+        # Optional Trace.Tracer; None keeps tracing to a single check per step.
+        self.tracer = None
+        # Optional callback(engine) called once when the game ends.
+        self.on_game_over = None
+
+        # Locked cells, stored as one bitmask per row.
+        self.board = Board(self.rows, self.columns)
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """
+        Start a new game, reusing the existing board.
+        """
+        # Always keep a concrete seed so the game can be replayed.
+        if seed is None:
+            seed = random.randrange(2 ** 63)
+        self.seed = seed
+        # 64-bit splitmix state, small enough to be part of every snapshot.
+        self.rng_state = seed & MASK64
+        self.board.clear()
+
+        # Active piece cells: list of [col, row]; empty list means no active piece.
+        self.active_piece_grid_pos = []
+        self.current_piece_shape = None
+        self.current_rotation_index = None
+        self.rotation_origin = None
+
+        self.score = 0
+        self.lines = 0
+        self.pieces = 0
+        self.ticks = 0
+        self.game_over = False
+
+        self.spawn()
+
+    @property
+    def inactive_pieces(self):
+        """
+        Locked cells as a list of tuples in the (collumn, row) format.
+        """
+        return self.board.cells()
+
+    def step(self, action):
+        """
+        Apply one action and return the number of lines it cleared.
+        """
+        self.ticks += 1
+        if self.game_over:
+            return 0
+        if self.tracer is not None and action != NOOP:
+            self._trace(action)
+        if action == DOWN:
+            return self.move_down()
+        if action == LEFT:
+            self.move_left()
+        elif action == RIGHT:
+            self.move_right()
+        elif action == ROTATE_LEFT:
+            self.rotate_left()
+        elif action == ROTATE_RIGHT:
+            self.rotate_right()
+        elif action == DROP:
+            return self.drop()
+        elif action == SPAWN:
+            self.spawn()
+        return 0
+
+    def _trace(self, event):
+        # Trace event codes for movement match the action codes.
+        col, row = self.rotation_origin if self.rotation_origin is not None else (-1, -1)
+        self.tracer.record(self.ticks, event, self.shape_index.get(self.current_piece_shape, -1), col, row)
+
+    def spawn(self, kind=None):
+        """
+        Spawn a multi-cell piece using the rotation table at the top, centered horizontally.
+        Tracks rotation index and pivot at offset (0,0).
+        """
+        if self.game_over:
+            return
+        if kind is None:
+            kind = self.shapes[self._next_random() % len(self.shapes)]
+
+        self.current_piece_shape = kind
+        rotations = self.rotations.get(kind, [])
+        if not rotations:
+            self.active_piece_grid_pos = []
+            self.current_rotation_index = None
+            self.rotation_origin = None
+            return
+
+        # Start with first rotation
+        idx = 0
+        offsets = rotations[idx]
+
+        # Center horizontally based on offsets span
+        min_dx = min(dx for dx, dy in offsets)
+        max_dx = max(dx for dx, dy in offsets)
+        span = max_dx - min_dx + 1
+        start_col = (self.columns - span) // 2 - min_dx
+        start_row = 0
+
+        # The pivot is the cell corresponding to offset (0,0)
+        pivot_col = start_col
+        pivot_row = start_row
+
+        cells = [[pivot_col + dx, pivot_row + dy] for dx, dy in offsets]
+
+        # Validate spawn; a blocked spawn ends the game.
+        if self.board.collides(cells):
+            self.active_piece_grid_pos = []
+            self.current_rotation_index = None
+            self.rotation_origin = None
+            self._end_game()
+            return
+
+        self.active_piece_grid_pos = cells
+        self.current_rotation_index = idx
+        self.rotation_origin = (pivot_col, pivot_row)
+
+    def _next_random(self):
+        """
+        Advance the splitmix64 generator and return the next 64-bit value.
+        """
+        self.rng_state = z = (self.rng_state + 0x9E3779B97F4A7C15) & MASK64
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+        return z ^ (z >> 31)
+
+    def snapshot(self):
+        """
+        Pack the full game state into an immutable bytes object (56 bytes for a 10x20 board).
+        """
+        if self.active_piece_grid_pos and self.rotation_origin is not None:
+            shape = self.shape_index[self.current_piece_shape]
+            rotation = self.current_rotation_index
+            pivot_col, pivot_row = self.rotation_origin
+        else:
+            shape, rotation, pivot_col, pivot_row = NO_PIECE, -1, 0, 0
+        header = SNAPSHOT_HEADER.pack(shape, rotation, pivot_col, pivot_row, self.game_over,
+                                      self.score, self.lines, self.pieces, self.ticks, self.rng_state)
+        return header + self.board.to_bytes()
+
+    def restore(self, data):
+        """
+        Restore the state saved by `snapshot` in place, reusing the existing board.
+        """
+        (shape, rotation, pivot_col, pivot_row, game_over,
+         self.score, self.lines, self.pieces, self.ticks, self.rng_state) = SNAPSHOT_HEADER.unpack_from(data)
+        self.game_over = bool(game_over)
+        self.board.load_bytes(data[SNAPSHOT_HEADER.size:])
+        if shape == NO_PIECE:
+            self.current_piece_shape = None
+            self.current_rotation_index = None
+            self.rotation_origin = None
+            self.active_piece_grid_pos = []
+            return
+        self.current_piece_shape = kind = self.shapes[shape]
+        self.current_rotation_index = rotation
+        self.rotation_origin = (pivot_col, pivot_row)
+        self.active_piece_grid_pos = [[pivot_col + dx, pivot_row + dy] for dx, dy in self.rotations[kind][rotation]]
+
+    def _apply_move(self, dcol, drow):
+        """
+        Apply movement vector to all active cells and move the rotation pivot.
+        """
+        self.active_piece_grid_pos = [[c + dcol, r + drow] for c, r in self.active_piece_grid_pos]
+        if self.rotation_origin is not None:
+            oc, orow = self.rotation_origin
+            self.rotation_origin = (oc + dcol, orow + drow)
+
+    def _rotate(self, direction):
+        """
+        Rotate the active piece in `direction` (Rotation.LEFT or Rotation.RIGHT) around the
+        tracked pivot, trying the precomputed wall-kick candidates in order.
+        Return True if the piece rotated.
+        """
+        if not self.active_piece_grid_pos or self.current_rotation_index is None:
+            return False
+        entries = self.rotation_table.get(self.current_piece_shape)
+        if not entries:
+            return False
+
+        next_idx, candidates = entries[self.current_rotation_index][direction]
+        pivot_col, pivot_row = self.rotation_origin
+        collides = self.board.collides
+        for kx, ky, offsets in candidates:
+            new_positions = [[pivot_col + dx, pivot_row + dy] for dx, dy in offsets]
+            if not collides(new_positions):
+                self.active_piece_grid_pos = new_positions
+                self.current_rotation_index = next_idx
+                # Update pivot with applied kick
+                self.rotation_origin = (pivot_col + kx, pivot_row + ky)
+                return True
+        # No valid rotation found; do nothing.
+        return False
+
+    def rotate_left(self):
+        """
+        Rotate the active piece left. Return True if it rotated.
+        """
+        return self._rotate(Rotation.LEFT)
+
+    def rotate_right(self):
+        """
+        Rotate the active piece right. Return True if it rotated.
+        """
+        return self._rotate(Rotation.RIGHT)
+
+    def _can_move(self, dcol, drow):
+        """
+        Check if active piece can move by (dcol, drow) without collisions or out of bounds.
+        """
+        if not self.active_piece_grid_pos:
+            return False
+        return not self.board.collides((col + dcol, row + drow) for col, row in self.active_piece_grid_pos)
+
+    def move_right(self):
+        # Move active piece right if possible
+        if self._can_move(1, 0):
+            self._apply_move(1, 0)
+            return True
+        return False
+
+    def move_left(self):
+        # Move active piece left if possible
+        if self._can_move(-1, 0):
+            self._apply_move(-1, 0)
+            return True
+        return False
+
+    def move_down(self):
+        """
+        Move active piece down; if blocked, lock it and clear full rows.
+        Return the number of lines cleared.
+        """
+        if not self.active_piece_grid_pos:
+            return 0
+        if self._can_move(0, 1):
+            self._apply_move(0, 1)
+            return 0
+        return self._lock()
+
+    def drop(self):
+        """
+        Hard drop: move down until blocked, then lock. Return the number of lines cleared.
+        """
+        if not self.active_piece_grid_pos:
+            return 0
+        distance = self.drop_distance()
+        if distance:
+            self._apply_move(0, distance)
+        return self._lock()
+
+    def drop_distance(self):
+        """
+        Return how many rows the active piece can fall before it lands.
+        """
+        if not self.active_piece_grid_pos:
+            return 0
+        distance = self.board.drop_distance(self.active_piece_grid_pos)
+        if distance is None:
+            # The piece is under an overhang, so the column heights do not apply; step down instead.
+            distance = 0
+            while self._can_move(0, distance + 1):
+                distance += 1
+        return distance
+
+    def ghost_cells(self):
+        """
+        Return the cells the active piece would occupy after a hard drop.
+        """
+        distance = self.drop_distance()
+        return [(c, r + distance) for c, r in self.active_piece_grid_pos]
+
+    def _lock(self):
+        """
+        Lock the active piece, clear full rows, update the score and spawn the next piece.
+        """
+        if self.tracer is not None:
+            self._trace(Trace.LOCK)
+        full_rows = self.board.lock(self.active_piece_grid_pos)
+        lines = Logic.clear_full_rows(self.board, full_rows)
+        self.score += Logic.SetScore(lines)
+        self.lines += lines
+        self.pieces += 1
+        # Spawn next piece unless the stack reached the top rows
+        self.active_piece_grid_pos = []
+        masks = self.board.row_masks
+        if masks[0] or masks[1]:
+            self._end_game()
+        else:
+            self.spawn()
+        return lines
+
+    def add_garbage(self, count, hole):
+        """
+        Push `count` garbage rows with an empty cell in column `hole` in from the bottom, as sent
+        by an opponent. The game ends if the stack is pushed into the top rows or the active piece.
+        """
+        if self.game_over or count <= 0:
+            return
+        if self.tracer is not None:
+            self.tracer.record(self.ticks, Trace.GARBAGE, -1, hole, count)
+        board = self.board
+        overflow = board.add_garbage(count, hole)
+        masks = board.row_masks
+        if overflow or masks[0] or masks[1] or board.collides(self.active_piece_grid_pos):
+            self._end_game()
+
+    def _end_game(self):
+        """
+        Mark the game as over and notify `on_game_over`. Raised from a lock, a blocked spawn or garbage.
+        """
+        self.game_over = True
+        if self.tracer is not None:
+            self._trace(Trace.GAME_OVER)
+        if self.on_game_over is not None:
+            self.on_game_over(self)
+
+    def check_game_over(self):
+        """
+        Return True once the game has ended: a locked cell in row 0 or 1, or a blocked spawn.
+        """
+        return self.game_over
@@ -0,0 +1,130 @@
+"""
+Gym-style single-game environment over `Engine`.
+
+`reset(seed)` returns an observation and `step(action)` returns
+`(observation, reward, done, info)`, with the reward from `Logic.SetScore`.
+Observations are read-only NumPy views, not copies: the board is a view of the
+board's cell buffer, kept up to date by `Board` itself, and the active piece is
+a small fixed buffer rewritten in place. The same observation and info objects
+are returned by every call, so stepping allocates next to nothing; copy what
+you need to keep.
+
+    python Env.py --steps 100000
+
+Requires NumPy.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from array import array
+
+import numpy as np
+
+import Engine
+import Logic
+
+ACTIONS = Engine.ACTIONS
+ACTION_COUNT = len(ACTIONS)
+
+# Piece vector written when there is no active piece
+NO_PIECE = (-1, -1, -1, -1)
+
+
+class Env:
+    """
+    One game with observations `{"board", "piece", "cells"}`:
+
+    - `board`: `(rows, columns)` uint8, 1 where a cell is locked.
+    - `piece`: shape index, rotation index, pivot column and pivot row of the active
+      piece, indexing `engine.rotations` (`Engine.block_rotations` by default); all -1 without one.
+    - `cells`: `(cells, 2)` (col, row) of the active piece, -1 without one.
+    """
+
+    def __init__(self, seed=None, rows=None, columns=None, rotations=None):
+        self.engine = Engine.Engine(seed, rows, columns, rotations)
+        engine = self.engine
+        self.rows = engine.rows
+        self.columns = engine.columns
+        self.cell_count = max(len(offsets) for patterns in engine.rotations.values() for offsets in patterns)
+
+        board = np.frombuffer(engine.board.enable_cell_buffer(), dtype=np.uint8)
+        board = board.reshape(self.rows, self.columns)
+        board.flags.writeable = False
+        self._piece = array("h", NO_PIECE)
+        piece = np.frombuffer(self._piece, dtype=np.int16)
+        piece.flags.writeable = False
+        self._cells = array("h", [-1] * (2 * self.cell_count))
+        cells = np.frombuffer(self._cells, dtype=np.int16).reshape(self.cell_count, 2)
+        cells.flags.writeable = False
+        self.observation = {"board": board, "piece": piece, "cells": cells}
+        self.info = {"score": 0, "lines": 0, "pieces": 0}
+        self._update()
+
+    def reset(self, seed=None):
+        """
+        Start a new game and return the observation.
+        """
+        self.engine.reset(seed)
+        self._update()
+        return self.observation
+
+    def step(self, action):
+        """
+        Apply one `Engine` action and return `(observation, reward, done, info)`.
+        """
+        engine = self.engine
+        lines = engine.step(action)
+        self._update()
+        return self.observation, Logic.SetScore(lines), engine.game_over, self.info
+
+    def _update(self):
+        engine = self.engine
+        piece = self._piece
+        cells = self._cells
+        active = engine.active_piece_grid_pos
+        if active:
+            piece[0] = engine.shape_index[engine.current_piece_shape]
+            piece[1] = engine.current_rotation_index
+            piece[2], piece[3] = engine.rotation_origin
+            count = len(active)
+            for i in range(self.cell_count):
+                # Pieces with fewer cells repeat their own cells, like `VecEnv`.
+                col, row = active[i % count]
+                cells[2 * i] = col
+                cells[2 * i + 1] = row
+        elif piece[0] != -1:
+            piece[0:4] = array("h", NO_PIECE)
+            for i in range(len(cells)):
+                cells[i] = -1
+        info = self.info
+        info["score"] = engine.score
+        info["lines"] = engine.lines
+        info["pieces"] = engine.pieces
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure environment steps per second with random actions.")
+    parser.add_argument("--steps", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    env = Env(args.seed)
+    rng = random.Random(args.seed)
+    actions = [rng.choice(ACTIONS) for _ in range(args.steps)]
+    games = 0
+    start = time.perf_counter()
+    for action in actions:
+        _, _, done, _ = env.step(action)
+        if done:
+            games += 1
+            env.reset()
+    elapsed = time.perf_counter() - start
+    result = {"steps": args.steps, "steps_per_second": args.steps / elapsed, "games_finished": games}
+    json.dump(result, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,6 @@
+from Board import Board
+
+
 def check_full_rows(block_positions, rows, columns):
     """
     Return (updated_block_positions, lines_cleared).
@@ -5,26 +8,39 @@ def check_full_rows(block_positions, rows, columns):
     if not block_positions:
         return block_positions, 0
 
-    # Find full rows
-    full_rows = []
-    row_count = {row: 0 for row in range(rows)}
-    for x, y in block_positions:
-        row_count[y] += 1
-    for row, count in row_count.items():
-        if count == columns:
-            full_rows.append(row)
-
-    # Remove blocks in full rows
-    block_positions_new = [pos for pos in block_positions if pos[1] not in full_rows]
-
-    # Shift remaining blocks down by number of cleared rows below them
-    full_rows.sort()
-    block_positions_adjusted = []
-    for x, y in block_positions_new:
-        rows_below = sum(1 for full_row in full_rows if full_row > y)
-        block_positions_adjusted.append((x, y + rows_below))
-
-    return block_positions_adjusted, len(full_rows)
+    board = Board(rows, columns)
+    board.set_cells(block_positions)
+    lines_cleared = board.clear_full_rows()
+    if not lines_cleared:
+        return block_positions, 0
+    return board.cells(), lines_cleared
+
+
+def check_full_rows_array(occupancy):
+    """
+    NumPy version of `check_full_rows` for a (rows, columns) occupancy array.
+    Return (updated_occupancy, lines_cleared); the input array is not modified.
+    """
+    # Imported here so the rules do not require NumPy unless this path is used.
+    import numpy as np
+
+    full = occupancy.all(axis=1)
+    lines_cleared = int(np.count_nonzero(full))
+    if not lines_cleared:
+        return occupancy, 0
+
+    # Keep the remaining rows in order and push them to the bottom of the board.
+    updated = np.zeros_like(occupancy)
+    updated[lines_cleared:] = occupancy[~full]
+    return updated, lines_cleared
+
+
+def clear_full_rows(board, full_rows=None):
+    """
+    Clear the full rows of a `Board` in place and return the number of lines cleared.
+    Pass `full_rows` when they are already known, e.g. from `Board.lock`, to skip the row scan.
+    """
+    return board.clear_full_rows(full_rows)
 
 
 def SetScore(lines_cleared):
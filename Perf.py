@@ -0,0 +1,79 @@
+"""
+Per-frame timing of the game loop phases.
+"""
+import json
+import time
+from collections import deque
+
+now_ns = time.perf_counter_ns
+
+
+class FrameProfiler:
+    """
+    Keep the last `window` samples (in nanoseconds) of each named phase,
+    e.g. "frame", "update", "draw", "draw_grid" and "draw_score".
+    """
+
+    def __init__(self, window=600):
+        self.window = window
+        self.samples = {}
+        self._last_frame = None
+
+    def add(self, phase, elapsed_ns):
+        samples = self.samples.get(phase)
+        if samples is None:
+            samples = self.samples[phase] = deque(maxlen=self.window)
+        samples.append(elapsed_ns)
+
+    def frame(self):
+        """
+        Mark the start of a frame; the time since the previous mark is recorded as "frame".
+        """
+        t = now_ns()
+        if self._last_frame is not None:
+            self.add("frame", t - self._last_frame)
+        self._last_frame = t
+
+    def stats(self, phase):
+        """
+        Return mean, p50, p95, p99 and max of a phase in milliseconds.
+        """
+        samples = sorted(self.samples.get(phase, ()))
+        if not samples:
+            return None
+        n = len(samples)
+
+        def pct(p):
+            return samples[min(n - 1, int(p * n))] / 1e6
+
+        return {
+            "count": n,
+            "mean": sum(samples) / n / 1e6,
+            "p50": pct(0.50),
+            "p95": pct(0.95),
+            "p99": pct(0.99),
+            "max": samples[-1] / 1e6,
+        }
+
+    def summary(self):
+        return {phase: self.stats(phase) for phase in self.samples}
+
+    def overlay_text(self):
+        """
+        Format the summary as short lines for an on-screen overlay.
+        """
+        lines = []
+        for phase, s in self.summary().items():
+            lines.append(f"{phase:<10} p50 {s['p50']:6.2f}  p95 {s['p95']:6.2f}  p99 {s['p99']:6.2f} ms")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        """
+        Write the summary and the raw samples to `path` as JSON.
+        """
+        data = {
+            "summary": self.summary(),
+            "samples_ns": {phase: list(samples) for phase, samples in self.samples.items()},
+        }
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
@@ -0,0 +1,263 @@
+"""
+Software rasterizer for headless frame capture.
+
+Draws the board the way the game view does, with the `Game` layout and colours,
+into an RGB NumPy array, without a window or OpenGL. Like the game view, only the
+cells whose colour changed since the previous frame are repainted, so a frame
+costs a few microseconds once the first one is drawn. Frames can be written as
+PNG files or appended to a raw rgb24 video stream:
+
+    python Raster.py game.ttr --png final.png
+    python Raster.py game.ttr --frames frames/ --every 2
+    python Raster.py game.ttr --raw game.rgb
+    ffmpeg -f rawvideo -pix_fmt rgb24 -s 650x900 -r 60 -i game.rgb game.mp4
+
+Requires NumPy.
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+
+import numpy as np
+
+import Game
+import Replay
+from Board import row_bytes
+from Engine import grid
+
+EMPTY = 0
+LOCKED = 1
+GHOST = 2
+ACTIVE = 3
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def rgb(color):
+    return color[:3]
+
+
+class Rasterizer:
+    """
+    Render an `Engine` into one reused `(height, width, 3)` uint8 frame.
+    `config` is a grid from `Game.make_grid`; tall boards show `visible_rows` rows
+    starting at `top`, which follows the active piece unless given.
+    With `crop` the frame is only the board rectangle instead of the whole window.
+    """
+
+    def __init__(self, config=grid, crop=False):
+        self.config = config
+        self.columns = config["columns"]
+        self.visible_rows = Game.visible_rows(config)
+        self.width = Game.WINDOW_WIDTH
+        self.height = Game.WINDOW_HEIGHT
+        self.palette = np.array([rgb(Game.EMPTY_COLOR), rgb(Game.LOCKED_COLOR), rgb(Game.GHOST_COLOR),
+                                 rgb(Game.ACTIVE_COLOR)], dtype=np.uint8)
+
+        board_left, board_bottom, total_w, total_h = Game.board_rect(config)
+        if crop:
+            self.origin = (round(board_left), round(board_bottom))
+            self.width, self.height = round(total_w), round(total_h)
+        else:
+            self.origin = (0, 0)
+        self.frame = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        self.frame[:] = rgb(Game.BACKGROUND_COLOR)
+        m = config["margin"]
+        self._fill(self._slices(board_left, board_bottom, total_w, total_h), Game.BOARD_COLOR)
+        self._fill(self._slices(board_left + m, board_bottom + m, total_w - 2 * m, total_h - 2 * m),
+                   Game.MARGIN_COLOR)
+        # Pixel slices of every drawn cell, indexed as row * columns + col
+        self.cells = [self._slices(*Game.cell_rect(col, row, config))
+                      for row in range(self.visible_rows) for col in range(self.columns)]
+        for cell in self.cells:
+            self._fill(cell, Game.EMPTY_COLOR)
+        # What the frame currently shows, used to find the cells that changed.
+        self.shown = np.zeros(self.visible_rows * self.columns, dtype=np.uint8)
+        self.top = 0
+
+    def _slices(self, left, bottom, width, height):
+        """
+        Return the frame slices of a rectangle given in window pixels with the origin bottom-left.
+        """
+        x, y = self.origin
+        x0 = max(round(left) - x, 0)
+        x1 = min(round(left + width) - x, self.width)
+        y0 = max(self.height - (round(bottom + height) - y), 0)
+        y1 = min(self.height - (round(bottom) - y), self.height)
+        return slice(y0, y1), slice(x0, x1)
+
+    def _fill(self, cell, color):
+        self.frame[cell] = rgb(color)
+
+    def follow(self, engine):
+        """
+        Return the first row to show so the active piece, or the stack top between pieces, is in view.
+        """
+        rows = engine.rows
+        visible = self.visible_rows
+        if visible >= rows:
+            return 0
+        active = engine.active_piece_grid_pos
+        focus = min(r for _, r in active) if active else min(engine.board.heights)
+        return min(max(focus - visible // 4, 0), rows - visible)
+
+    def render(self, engine, top=None, ghost=True):
+        """
+        Draw the engine's board, active piece and, with `ghost`, its landing cells; return the frame.
+        The frame is reused by the next call, so copy it to keep it.
+        """
+        if top is None:
+            top = self.follow(engine)
+        self.top = top
+        cols = self.columns
+        bottom = top + self.visible_rows
+        masks = engine.board.row_masks[top:bottom]
+        state = np.frombuffer(b"".join([row_bytes(mask, cols) for mask in masks]), dtype=np.uint8).copy()
+        if ghost and engine.active_piece_grid_pos:
+            for col, row in engine.ghost_cells():
+                if top <= row < bottom:
+                    state[(row - top) * cols + col] = GHOST
+        for col, row in engine.active_piece_grid_pos:
+            if top <= row < bottom:
+                state[(row - top) * cols + col] = ACTIVE
+
+        changed = np.flatnonzero(state != self.shown)
+        frame = self.frame
+        palette = self.palette
+        cells = self.cells
+        for index in changed.tolist():
+            frame[cells[index]] = palette[state[index]]
+        self.shown = state
+        return frame
+
+
+def scale_frame(frame, factor):
+    """
+    Return a view of `frame` keeping every `factor`-th pixel, for thumbnails.
+    """
+    return frame[::factor, ::factor] if factor > 1 else frame
+
+
+def png_bytes(frame, level=1):
+    """
+    Encode an RGB frame as PNG with zlib at compression `level`.
+    """
+    height, width, _ = frame.shape
+    # Every scanline starts with filter type 0 (none).
+    raw = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    raw[:, 1:] = frame.reshape(height, width * 3)
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (PNG_SIGNATURE + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw.tobytes(), level))
+            + chunk(b"IEND", b""))
+
+
+def write_png(path, frame, level=1):
+    with open(path, "wb") as f:
+        f.write(png_bytes(frame, level))
+
+
+class RawWriter:
+    """
+    Append frames to a headerless rgb24 file, e.g. for `ffmpeg -f rawvideo -pix_fmt rgb24`.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        self.frames = 0
+
+    def write(self, frame):
+        self.file.write(np.ascontiguousarray(frame).data)
+        self.frames += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def replay_frames(replay, rasterizer=None, every=1, ghost=True):
+    """
+    Play a replay headless and yield `(tick, frame)` every `every` ticks, then once for the final state.
+    Each frame is the state after all actions of its tick; frames are reused, so copy them to keep them.
+    """
+    engine = replay.new_engine()
+    if rasterizer is None:
+        rasterizer = Rasterizer(Game.make_grid(replay.rows, replay.columns))
+    step = engine.step
+    ticks = replay.ticks
+    actions = replay.actions
+    count = len(actions)
+    last_tick = ticks[-1] if count else 0
+    index = 0
+    for tick in range(0, last_tick + 1, every):
+        while index < count and ticks[index] <= tick:
+            step(actions[index])
+            index += 1
+        yield tick, rasterizer.render(engine, ghost=ghost)
+    if last_tick % every:
+        while index < count:
+            step(actions[index])
+            index += 1
+        yield last_tick, rasterizer.render(engine, ghost=ghost)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a replay to PNG files or raw rgb24 video frames.")
+    parser.add_argument("replay", help="replay file written with TOOTRIS_RECORD")
+    parser.add_argument("--png", metavar="PATH", help="write the final frame as a PNG thumbnail")
+    parser.add_argument("--frames", metavar="DIR", help="write every exported frame as DIR/<tick>.png")
+    parser.add_argument("--raw", metavar="PATH", help="append every exported frame to a raw rgb24 file")
+    parser.add_argument("--every", type=int, default=1, help="export one frame every this many ticks")
+    parser.add_argument("--scale", type=int, default=1, help="keep every n-th pixel (thumbnails)")
+    parser.add_argument("--crop", action="store_true", help="render only the board, not the whole window")
+    parser.add_argument("--no-ghost", dest="ghost", action="store_false", help="do not draw the landing cells")
+    args = parser.parse_args(argv)
+
+    replay = Replay.Replay.load(args.replay)
+    rasterizer = Rasterizer(Game.make_grid(replay.rows, replay.columns), crop=args.crop)
+    if args.frames:
+        os.makedirs(args.frames, exist_ok=True)
+    raw = RawWriter(args.raw) if args.raw else None
+    frames = 0
+    start = time.perf_counter()
+    try:
+        for last_tick, frame in replay_frames(replay, rasterizer, args.every, args.ghost):
+            frame = scale_frame(frame, args.scale)
+            if args.frames:
+                write_png(os.path.join(args.frames, f"{last_tick:07d}.png"), frame)
+            if raw is not None:
+                raw.write(frame)
+            frames += 1
+    finally:
+        if raw is not None:
+            raw.close()
+    if args.png:
+        write_png(args.png, frame, level=9)
+    elapsed = time.perf_counter() - start
+    height, width, _ = frame.shape
+    result = {
+        "replay": args.replay,
+        "frames": frames,
+        "ticks": last_tick,
+        "size": [width, height],
+        "frames_per_second": frames / elapsed if elapsed else 0.0,
+        # Game seconds rendered per wall-clock second
+        "realtime_factor": last_tick / Replay.TICK_RATE / elapsed if elapsed else 0.0,
+    }
+    json.dump(result, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
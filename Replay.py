@@ -0,0 +1,136 @@
+"""
+Deterministic replay recording and playback.
+
+A replay is the engine seed, the board size and the stream of (tick, action) pairs
+that were passed to `Engine.step`, including the gravity moves. Ticks count at
+`TICK_RATE` per second so a replay can be played back at real speed, or ignored
+to play it headless as fast as possible:
+
+    python Replay.py game.ttr
+"""
+import json
+import struct
+import sys
+from array import array
+
+import Engine
+import Scheduler
+
+MAGIC = b"TTRP"
+VERSION = 2
+TICK_RATE = Scheduler.TICK_RATE
+
+# magic, version, seed, rows, columns, record count
+HEADER = struct.Struct("<4sBqHHI")
+
+
+class Recorder:
+    """
+    Collect the (tick, action) stream of one game.
+    """
+
+    def __init__(self, seed, rows, columns):
+        self.seed = seed
+        self.rows = rows
+        self.columns = columns
+        self.ticks = array("I")
+        self.actions = array("B")
+
+    def reset(self, seed):
+        """
+        Start recording a new game, keeping the existing buffers.
+        """
+        self.seed = seed
+        del self.ticks[:]
+        del self.actions[:]
+
+    def record(self, tick, action):
+        self.ticks.append(tick)
+        self.actions.append(action)
+
+    def to_bytes(self):
+        ticks = self.ticks
+        actions = self.actions
+        if sys.byteorder != "little":
+            ticks = array("I", ticks)
+            ticks.byteswap()
+        header = HEADER.pack(MAGIC, VERSION, self.seed, self.rows, self.columns, len(actions))
+        return header + ticks.tobytes() + actions.tobytes()
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+
+class Replay:
+    """
+    A recorded game that can be played back on a fresh `Engine`.
+    """
+
+    def __init__(self, seed, rows, columns, ticks, actions):
+        self.seed = seed
+        self.rows = rows
+        self.columns = columns
+        self.ticks = ticks
+        self.actions = actions
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, seed, rows, columns, count = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not a Tootris replay")
+        if version != VERSION:
+            raise ValueError(f"unsupported replay version {version}")
+        offset = HEADER.size
+        ticks = array("I")
+        ticks.frombytes(data[offset:offset + count * ticks.itemsize])
+        if sys.byteorder != "little":
+            ticks.byteswap()
+        offset += count * ticks.itemsize
+        actions = array("B", data[offset:offset + count])
+        return cls(seed, rows, columns, ticks, actions)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+    def __len__(self):
+        return len(self.actions)
+
+    def __iter__(self):
+        return zip(self.ticks, self.actions)
+
+    def new_engine(self):
+        return Engine.Engine(self.seed, self.rows, self.columns)
+
+    def play(self, engine=None, until_tick=None):
+        """
+        Apply the recorded actions headless, as fast as possible, and return the engine.
+        Stops before the first record after `until_tick` when it is given.
+        """
+        if engine is None:
+            engine = self.new_engine()
+        step = engine.step
+        if until_tick is None:
+            for action in self.actions:
+                step(action)
+        else:
+            for tick, action in zip(self.ticks, self.actions):
+                if tick > until_tick:
+                    break
+                step(action)
+        return engine
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    for path in argv:
+        engine = Replay.load(path).play()
+        result = {"replay": path, "score": engine.score, "lines": engine.lines,
+                  "pieces": engine.pieces, "game_over": engine.game_over}
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
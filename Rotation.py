@@ -0,0 +1,58 @@
+"""
+Precomputed rotation and wall-kick tables.
+"""
+
+# Kick offsets tried in order: no kick, left, right, up, down, extend left/right
+KICKS = ((0, 0), (-1, 0), (1, 0), (0, -1), (0, 1), (-2, 0), (2, 0))
+
+# Rotation directions, also used to index a table entry
+LEFT = 0
+RIGHT = 1
+
+_tables = {}
+
+
+def build_rotation_table(rotations, kicks=KICKS):
+    """
+    Return {shape: [(left_entry, right_entry) for each rotation index]}.
+    Each entry is (next_index, candidates) and each candidate is
+    (kick_col, kick_row, cell_offsets) with the kick already folded into the offsets,
+    so a rotation only needs to add the pivot and test for collisions.
+    """
+    table = {}
+    for shape, patterns in rotations.items():
+        count = len(patterns)
+        per_index = []
+        for idx in range(count):
+            entries = []
+            for step in (-1, 1):
+                next_idx = (idx + step) % count
+                offsets = patterns[next_idx]
+                candidates = tuple(
+                    (kx, ky, tuple((dx + kx, dy + ky) for dx, dy in offsets))
+                    for kx, ky in kicks
+                )
+                entries.append((next_idx, candidates))
+            per_index.append(tuple(entries))
+        table[shape] = tuple(per_index)
+    return table
+
+
+def rotations_key(rotations):
+    """
+    Return a hashable copy of `rotations`; equal rotation sets give equal keys.
+    """
+    return tuple((shape, tuple(tuple(tuple(offset) for offset in pattern) for pattern in patterns))
+                 for shape, patterns in rotations.items())
+
+
+def rotation_table(rotations):
+    """
+    Return the rotation table for `rotations`, building it only once per distinct rotation set.
+    The cache is keyed on the contents, so equal dicts share a table and a dict changed in place gets a new one.
+    """
+    key = rotations_key(rotations)
+    table = _tables.get(key)
+    if table is None:
+        table = _tables[key] = build_rotation_table(rotations)
+    return table
@@ -0,0 +1,204 @@
+"""
+Fixed-timestep game loop: gravity levels, delayed auto-shift / auto-repeat input
+and lock delay, all counted in logic ticks so play is independent of the frame rate.
+Soft drop only moves a piece down; once it is grounded, it locks after the lock delay
+like any other piece, and only a hard drop locks at once.
+"""
+import struct
+
+import Engine
+
+TICK_RATE = 60
+
+# Ticks per gravity row for each level; the level goes up every 10 lines.
+GRAVITY_CURVE = (60, 48, 37, 28, 21, 16, 11, 8, 6, 4, 3, 2, 1)
+LINES_PER_LEVEL = 10
+
+# Input timing in ticks
+DAS = 10
+ARR = 2
+SOFT_DROP_INTERVAL = 2
+LOCK_DELAY = 30
+MAX_LOCK_RESETS = 15
+MAX_CATCHUP_TICKS = 5
+
+# Controller state kept in snapshots: accumulator, tick, gravity counter, lock counter, lock resets
+STATE = struct.Struct("<dIIII")
+
+# Actions that auto-repeat while their key is held
+REPEATING = (Engine.LEFT, Engine.RIGHT)
+
+
+def gravity_interval(level):
+    """
+    Return the number of ticks between gravity rows at `level`.
+    """
+    return GRAVITY_CURVE[min(level, len(GRAVITY_CURVE) - 1)]
+
+
+class FixedTimestep:
+    """
+    Turn variable frame times into a whole number of fixed-length logic ticks.
+    After a stall at most `max_catchup` ticks are run; the rest of the backlog is dropped.
+    """
+
+    def __init__(self, tick_rate=TICK_RATE, max_catchup=MAX_CATCHUP_TICKS):
+        self.tick_length = 1.0 / tick_rate
+        self.max_catchup = max_catchup
+        self.accumulator = 0.0
+
+    def advance(self, delta_time):
+        self.accumulator += delta_time
+        ticks = int(self.accumulator / self.tick_length)
+        if ticks > self.max_catchup:
+            ticks = self.max_catchup
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= ticks * self.tick_length
+        return ticks
+
+
+class Controller:
+    """
+    Drive an `Engine` one fixed tick at a time from held-key input, gravity and lock delay.
+    `on_action(tick, action)` is called before every engine step, e.g. to record a replay.
+    """
+
+    def __init__(self, engine, on_action=None, tick_rate=TICK_RATE, max_catchup=MAX_CATCHUP_TICKS,
+                 das=DAS, arr=ARR, soft_drop_interval=SOFT_DROP_INTERVAL, lock_delay=LOCK_DELAY,
+                 max_lock_resets=MAX_LOCK_RESETS):
+        self.engine = engine
+        self.on_action = on_action
+        self.timestep = FixedTimestep(tick_rate, max_catchup)
+        self.das = das
+        self.arr = arr
+        self.soft_drop_interval = soft_drop_interval
+        self.lock_delay = lock_delay
+        self.max_lock_resets = max_lock_resets
+        self.reset()
+
+    def reset(self):
+        self.tick = 0
+        self.timestep.accumulator = 0.0
+        self.gravity_counter = 0
+        self.lock_counter = 0
+        self.lock_resets = 0
+        # (action, pressed) key events waiting for the next tick, in the order they happened,
+        # and held keys mapped to the ticks they have been held.
+        self.inputs = []
+        self.held = {}
+        self.shift = None
+
+    @property
+    def level(self):
+        return self.engine.lines // LINES_PER_LEVEL
+
+    def press(self, action):
+        self.inputs.append((action, True))
+
+    def release(self, action):
+        # Applied on the next tick after any earlier press, so a tap between ticks still moves once.
+        self.inputs.append((action, False))
+
+    def _release(self, action):
+        self.held.pop(action, None)
+        if self.shift == action:
+            # Fall back to the other direction if it is still held.
+            self.shift = next((a for a in REPEATING if a in self.held), None)
+
+    def update(self, delta_time):
+        """
+        Run the ticks due after `delta_time` seconds and return how many ran.
+        """
+        ticks = self.timestep.advance(delta_time)
+        for _ in range(ticks):
+            self.run_tick()
+        return ticks
+
+    def step(self, action):
+        """
+        Apply one action at the current tick; moves and rotations of a grounded piece reset the lock delay.
+        """
+        engine = self.engine
+        if self.on_action is not None:
+            self.on_action(self.tick, action)
+        before = engine.active_piece_grid_pos
+        pieces = engine.pieces
+        lines = engine.step(action)
+        if engine.pieces != pieces:
+            self.lock_counter = 0
+            self.lock_resets = 0
+            self.gravity_counter = 0
+        elif engine.active_piece_grid_pos is not before and self.lock_counter:
+            if self.lock_resets < self.max_lock_resets:
+                self.lock_resets += 1
+                self.lock_counter = 0
+        return lines
+
+    def soft_drop(self):
+        """
+        Move the piece down one row; a grounded piece is left to the lock delay instead of locking.
+        """
+        self.gravity_counter = 0
+        if self.engine._can_move(0, 1):
+            self.step(Engine.DOWN)
+
+    def run_tick(self):
+        engine = self.engine
+        self.tick += 1
+        if engine.game_over:
+            return
+
+        # New presses act on this tick; releases end the hold of the keys pressed before them.
+        inputs = self.inputs
+        self.inputs = []
+        for action, pressed in inputs:
+            if not pressed:
+                self._release(action)
+            elif action in REPEATING:
+                self.held[action] = 0
+                self.shift = action
+                self.step(action)
+            elif action == Engine.DOWN:
+                self.held[action] = 0
+                self.soft_drop()
+            else:
+                self.step(action)
+
+        # Held keys auto-repeat: sideways after DAS every ARR ticks, soft drop every few ticks.
+        for action, held_for in self.held.items():
+            self.held[action] = held_for = held_for + 1
+            if action == self.shift and held_for >= self.das:
+                if self.arr == 0:
+                    while engine._can_move(1 if action == Engine.RIGHT else -1, 0):
+                        self.step(action)
+                elif (held_for - self.das) % self.arr == 0:
+                    self.step(action)
+            elif action == Engine.DOWN and held_for % self.soft_drop_interval == 0:
+                self.soft_drop()
+
+        if not engine.active_piece_grid_pos or engine.game_over:
+            return
+
+        # A grounded piece locks after the lock delay instead of on the next gravity row.
+        if not engine._can_move(0, 1):
+            self.lock_counter += 1
+            if self.lock_counter >= self.lock_delay:
+                self.step(Engine.DOWN)
+            return
+        self.lock_counter = 0
+        self.gravity_counter += 1
+        if self.gravity_counter >= gravity_interval(self.level):
+            self.gravity_counter = 0
+            self.step(Engine.DOWN)
+
+    def snapshot(self):
+        return STATE.pack(self.timestep.accumulator, self.tick, self.gravity_counter,
+                          self.lock_counter, self.lock_resets)
+
+    def restore(self, data, offset=0):
+        (self.timestep.accumulator, self.tick, self.gravity_counter,
+         self.lock_counter, self.lock_resets) = STATE.unpack_from(data, offset)
+        self.inputs = []
+        self.held = {}
+        self.shift = None
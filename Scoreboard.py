@@ -0,0 +1,161 @@
+"""
+High-score leaderboard persisted to `score.json`.
+
+Reads are cached in memory after the first load. Writes go through a background
+thread and replace the file atomically (temp file + rename), so a crash mid-write
+never leaves a corrupt score file and the game never waits on disk I/O.
+"""
+import atexit
+import datetime
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+DEFAULT_PATH = "score.json"
+DEFAULT_SIZE = 10
+# Longest the exit handler waits for pending writes, in seconds
+FLUSH_TIMEOUT = 5.0
+
+logger = logging.getLogger(__name__)
+
+_scoreboards = {}
+
+
+def get_scoreboard(path=DEFAULT_PATH, size=DEFAULT_SIZE):
+    """
+    Return the shared Scoreboard for `path`, so its cache survives between games.
+    """
+    board = _scoreboards.get(path)
+    if board is None:
+        board = _scoreboards[path] = Scoreboard(path, size)
+    return board
+
+
+class Scoreboard:
+    """
+    Top-`size` leaderboard of entries {"score", "lines", "duration", "date"}, best first.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, size=DEFAULT_SIZE):
+        self.path = path
+        self.size = size
+        self.entries = None
+        self._lock = threading.Lock()
+        self._writes = queue.Queue()
+        self._writer = None
+        # Set while the newest write attempt failed; cleared by the next successful write.
+        self.write_failed = False
+
+    def load(self):
+        """
+        Return the leaderboard entries, reading the file only the first time.
+        """
+        if self.entries is None:
+            self.entries = self._read()
+        return self.entries
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return []
+        except (ValueError, OSError):
+            # Unreadable file; start over rather than failing the game-over screen.
+            return []
+        if isinstance(data, int):
+            # Old format: a single high score
+            return [self._entry(data)] if data > 0 else []
+        entries = data.get("leaderboard", []) if isinstance(data, dict) else []
+        entries = [e for e in entries if isinstance(e, dict) and isinstance(e.get("score"), int)]
+        entries.sort(key=lambda e: e["score"], reverse=True)
+        return entries[:self.size]
+
+    @staticmethod
+    def _entry(score, lines=0, duration=0.0, date=None):
+        if date is None:
+            date = datetime.datetime.now().isoformat(timespec="seconds")
+        return {"score": int(score), "lines": int(lines), "duration": round(float(duration), 2), "date": date}
+
+    @property
+    def high_score(self):
+        entries = self.load()
+        return entries[0]["score"] if entries else 0
+
+    def submit(self, score, lines=0, duration=0.0, date=None):
+        """
+        Add a finished game and return its 1-based rank, or None if it did not make the board.
+        The file is written in the background.
+        """
+        entry = self._entry(score or 0, lines, duration, date)
+        with self._lock:
+            entries = self.load()
+            rank = next((i for i, e in enumerate(entries) if entry["score"] > e["score"]), len(entries))
+            if rank >= self.size:
+                return None
+            entries.insert(rank, entry)
+            del entries[self.size:]
+            data = {"high_score": entries[0]["score"], "leaderboard": list(entries)}
+        self._schedule_write(data)
+        return rank + 1
+
+    def _schedule_write(self, data):
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, name="tootris-scores", daemon=True)
+            self._writer.start()
+            atexit.register(self.flush)
+        self._writes.put(data)
+
+    def _write_loop(self):
+        while True:
+            data = self._writes.get()
+            # Only the newest pending leaderboard needs to reach the disk.
+            skipped = 0
+            while not self._writes.empty():
+                data = self._writes.get_nowait()
+                skipped += 1
+            try:
+                self._write(data)
+            except Exception:
+                # Keep the writer alive; the next submit tries again with the full leaderboard.
+                self.write_failed = True
+                logger.exception("could not write %s", self.path)
+            finally:
+                for _ in range(skipped + 1):
+                    self._writes.task_done()
+
+    def _write(self, data):
+        import tempfile
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".score-", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self.write_failed = False
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def flush(self, timeout=FLUSH_TIMEOUT):
+        """
+        Wait until every submitted score has been written, for at most `timeout` seconds.
+        Return True when nothing is left to write and the last write reached the disk.
+        """
+        writes = self._writes
+        deadline = time.monotonic() + timeout
+        with writes.all_tasks_done:
+            while writes.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._writer is None or not self._writer.is_alive():
+                    return False
+                writes.all_tasks_done.wait(min(remaining, 0.1))
+        return not self.write_failed
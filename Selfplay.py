@@ -0,0 +1,208 @@
+"""
+Play many seeded headless games in parallel and summarise the results.
+
+    python Selfplay.py --games 10000 --policy greedy --workers 8
+"""
+import argparse
+import json
+import multiprocessing
+import random
+import statistics
+import sys
+import time
+
+import AI
+import Engine
+
+
+class RandomPolicy:
+    """
+    Pick a uniformly random action every tick.
+    """
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def __call__(self, engine):
+        return self.rng.choice(Engine.ACTIONS)
+
+
+class GreedyPolicy:
+    """
+    For each new piece, try every rotation and column, keep the placement that clears
+    the most lines and leaves the lowest stack, then steer the piece there and hard drop.
+    """
+
+    def __init__(self, seed=None):
+        self.piece = None
+        self.target = None
+        self.rotated_from = None
+
+    def __call__(self, engine):
+        if self.piece != engine.pieces:
+            self.piece = engine.pieces
+            self.target = self._best_placement(engine)
+            self.rotated_from = None
+        if self.target is None:
+            return Engine.DROP
+
+        target_rotation, target_col = self.target
+        if engine.current_rotation_index != target_rotation:
+            if self.rotated_from == engine.current_rotation_index:
+                # The last rotation was blocked; give up on this placement.
+                self.target = None
+                return Engine.DROP
+            self.rotated_from = engine.current_rotation_index
+            return Engine.ROTATE_RIGHT
+
+        pivot_col = engine.rotation_origin[0]
+        if pivot_col < target_col:
+            return Engine.RIGHT if engine._can_move(1, 0) else Engine.DROP
+        if pivot_col > target_col:
+            return Engine.LEFT if engine._can_move(-1, 0) else Engine.DROP
+        return Engine.DROP
+
+    def _best_placement(self, engine):
+        rotations = engine.rotations.get(engine.current_piece_shape, [])
+        if not rotations or engine.rotation_origin is None:
+            return None
+        board = engine.board
+        pivot_row = engine.rotation_origin[1]
+        best = None
+        best_key = None
+        for idx, offsets in enumerate(rotations):
+            for pivot_col in range(-2, engine.columns + 2):
+                cells = [(pivot_col + dx, pivot_row + dy) for dx, dy in offsets]
+                if board.collides(cells):
+                    continue
+                # Drop straight down until blocked
+                distance = board.drop_distance(cells)
+                if distance is None:
+                    distance = 0
+                    while not board.collides((c, r + distance + 1) for c, r in cells):
+                        distance += 1
+                cells = [(c, r + distance) for c, r in cells]
+                trial = board.copy()
+                trial.lock(cells)
+                lines = trial.clear_full_rows()
+                top = min(trial.heights)
+                key = (lines, top)
+                if best_key is None or key > best_key:
+                    best_key = key
+                    best = (idx, pivot_col)
+        return best
+
+
+class AIPolicy:
+    """
+    Play the placement chosen by `AI.PlacementAI` for each piece.
+    One AI, and so one evaluation cache, is shared by all games played in a process.
+    """
+
+    _ai = None
+
+    def __init__(self, seed=None):
+        if AIPolicy._ai is None:
+            AIPolicy._ai = AI.PlacementAI()
+        self.ai = AIPolicy._ai
+        self.piece = None
+        self.plan = []
+
+    def __call__(self, engine):
+        if self.piece != engine.pieces:
+            self.piece = engine.pieces
+            self.plan = self.ai.plan(engine)
+            self.plan.reverse()
+        return self.plan.pop() if self.plan else Engine.DROP
+
+
+POLICIES = {
+    "random": RandomPolicy,
+    "greedy": GreedyPolicy,
+    "ai": AIPolicy,
+}
+
+
+def play_game(seed, policy="random", max_ticks=100000):
+    """
+    Play one game with the named policy and return its result as a dict.
+    """
+    engine = Engine.Engine(seed)
+    choose = POLICIES[policy](seed)
+    while not engine.game_over and engine.ticks < max_ticks:
+        engine.step(choose(engine))
+    return {
+        "seed": seed,
+        "score": engine.score,
+        "lines": engine.lines,
+        "pieces": engine.pieces,
+        "ticks": engine.ticks,
+    }
+
+
+def _play_game(args):
+    return play_game(*args)
+
+
+def run(games, seed=0, policy="random", max_ticks=100000, workers=None, chunksize=16):
+    """
+    Play `games` games with seeds seed, seed+1, ... and yield each result as soon as it finishes.
+    """
+    jobs = ((seed + i, policy, max_ticks) for i in range(games))
+    if workers == 1:
+        for job in jobs:
+            yield _play_game(job)
+        return
+    with multiprocessing.Pool(workers) as pool:
+        yield from pool.imap_unordered(_play_game, jobs, chunksize)
+
+
+def summarize(results):
+    """
+    Aggregate a list of game results into per-field summary statistics.
+    """
+    summary = {"games": len(results)}
+    if not results:
+        return summary
+    for field in ("score", "lines", "pieces", "ticks"):
+        values = [result[field] for result in results]
+        summary[field] = {
+            "mean": statistics.fmean(values),
+            "stdev": statistics.pstdev(values),
+            "min": min(values),
+            "median": statistics.median(values),
+            "max": max(values),
+        }
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run headless Tootris self-play games.")
+    parser.add_argument("--games", "-n", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="random")
+    parser.add_argument("--workers", "-j", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--max-ticks", type=int, default=100000)
+    parser.add_argument("--results", help="write one JSON line per game to this file")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    results = []
+    out = open(args.results, "w") if args.results else None
+    try:
+        for result in run(args.games, args.seed, args.policy, args.max_ticks, args.workers):
+            results.append(result)
+            if out:
+                out.write(json.dumps(result) + "\n")
+    finally:
+        if out:
+            out.close()
+
+    summary = summarize(results)
+    summary["seconds"] = time.perf_counter() - started
+    json.dump(summary, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Low-overhead event tracing for the game engine.
+
+Events are kept in a fixed-size ring buffer of integer records
+(tick, event, piece, col, row). Engines only pay for a `None` check when no
+tracer is attached, and an optional background thread flushes new records to a file.
+"""
+from array import array
+
+# Event types; the movement events share their codes with the Engine actions.
+MOVE_LEFT = 1
+MOVE_RIGHT = 2
+MOVE_DOWN = 3
+ROTATE_LEFT = 4
+ROTATE_RIGHT = 5
+DROP = 6
+SPAWN = 7
+LOCK = 8
+GAME_OVER = 9
+GARBAGE = 10
+
+EVENT_NAMES = {
+    MOVE_LEFT: "move_left",
+    MOVE_RIGHT: "move_right",
+    MOVE_DOWN: "move_down",
+    ROTATE_LEFT: "rotate_left",
+    ROTATE_RIGHT: "rotate_right",
+    DROP: "drop",
+    SPAWN: "spawn",
+    LOCK: "lock",
+    GAME_OVER: "game_over",
+    GARBAGE: "garbage",
+}
+
+FIELDS = 5
+
+
+class Tracer:
+    """
+    Ring buffer of the most recent `capacity` trace records.
+    """
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.buffer = array("i", [0]) * (capacity * FIELDS)
+        # Total number of records ever written; the next record goes to slot count % capacity.
+        self.count = 0
+        self._flushed = 0
+        self._flush_thread = None
+        self._stop = None
+
+    def record(self, tick, event, piece, col, row):
+        i = (self.count % self.capacity) * FIELDS
+        buf = self.buffer
+        buf[i] = tick
+        buf[i + 1] = event
+        buf[i + 2] = piece
+        buf[i + 3] = col
+        buf[i + 4] = row
+        self.count += 1
+
+    def records(self, since=0):
+        """
+        Return the buffered records from record number `since` onwards, oldest first.
+        """
+        end = self.count
+        start = max(since, end - self.capacity)
+        buf = self.buffer
+        result = []
+        for n in range(start, end):
+            i = (n % self.capacity) * FIELDS
+            result.append(tuple(buf[i:i + FIELDS]))
+        # Drop anything the writer may have overwritten while we were reading.
+        overwritten = self.count - self.capacity - start
+        if overwritten > 0:
+            result = result[overwritten:]
+        return result
+
+    def clear(self):
+        self.count = 0
+        self._flushed = 0
+
+    def flush(self, f):
+        """
+        Write the records added since the last flush to the text file `f`, one per line.
+        """
+        since = self._flushed
+        end = self.count
+        if end - since > self.capacity:
+            f.write(f"# dropped {end - since - self.capacity} records\n")
+        for tick, event, piece, col, row in self.records(since):
+            f.write(f"{tick} {EVENT_NAMES.get(event, event)} {piece} {col} {row}\n")
+        self._flushed = end
+        f.flush()
+
+    def start_flush(self, path, interval=1.0):
+        """
+        Append new records to `path` from a background thread every `interval` seconds.
+        """
+        if self._flush_thread is not None:
+            return
+        # Only tracing to a file needs threads, so they are not imported with the engine.
+        import threading
+        self._stop = threading.Event()
+
+        def run():
+            with open(path, "a") as f:
+                while not self._stop.wait(interval):
+                    self.flush(f)
+                self.flush(f)
+
+        self._flush_thread = threading.Thread(target=run, name="tootris-trace", daemon=True)
+        self._flush_thread.start()
+
+    def stop_flush(self):
+        """
+        Stop the background flush thread after a final flush.
+        """
+        if self._flush_thread is None:
+            return
+        self._stop.set()
+        self._flush_thread.join()
+        self._flush_thread = None
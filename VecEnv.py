@@ -0,0 +1,309 @@
+"""
+Batched simulator: N games stepped in lockstep with NumPy.
+
+All boards live in one `(N, rows, columns)` uint8 array and every tick applies N
+actions with array operations: moves, rotations with wall kicks, hard drops,
+locking and full-row clears. The rules, the splitmix64 piece sequence and the
+scoring match `Engine`, so env `i` of `VecEnv(n, seed)` plays exactly like
+`Engine(seed + i)` given the same actions. Finished games are reset in place.
+
+    python VecEnv.py --envs 4096 --steps 2000
+
+Requires NumPy.
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+import Engine
+import Logic
+import Rotation
+from Engine import grid, block_rotations
+
+MASK64 = np.uint64(Engine.MASK64)
+GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+MIX2 = np.uint64(0x94D049BB133111EB)
+
+
+class VecEnv:
+    """
+    `n` games of the same board size. `boards[i, row, col]` is 1 where a cell is locked;
+    the active pieces are kept separately as shape, rotation and pivot arrays.
+    """
+
+    def __init__(self, n, seed=0, rows=None, columns=None, rotations=None, auto_reset=True):
+        self.n = n
+        self.rows = grid["rows"] if rows is None else rows
+        self.columns = grid["columns"] if columns is None else columns
+        self.rotations = block_rotations if rotations is None else rotations
+        self.shapes = list(self.rotations.keys())
+        self.auto_reset = auto_reset
+        self._build_tables()
+
+        # Boards sit inside a border of occupied cells wide enough for any move, rotation or kick,
+        # so collision tests are a single gather with no bounds checks. `boards` is a view of the inside.
+        pad = self.pad
+        self._padded = np.ones((n, self.rows + 2 * pad, self.columns + 2 * pad), dtype=np.uint8)
+        self._flat = self._padded.reshape(-1)
+        self._stride = self._padded.shape[1] * self._padded.shape[2]
+        self._width = self._padded.shape[2]
+        self.boards = self._padded[:, pad:pad + self.rows, pad:pad + self.columns]
+        self.kind = np.zeros(n, dtype=np.intp)
+        self.rotation = np.zeros(n, dtype=np.intp)
+        self.pivot_col = np.zeros(n, dtype=np.intp)
+        self.pivot_row = np.zeros(n, dtype=np.intp)
+        self.rng_state = np.zeros(n, dtype=np.uint64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.lines = np.zeros(n, dtype=np.int64)
+        self.pieces = np.zeros(n, dtype=np.int64)
+        self.ticks = np.zeros(n, dtype=np.int64)
+        self.game_over = np.zeros(n, dtype=bool)
+        # Results of each env's last finished game, and how many games it has finished
+        self.final_score = np.zeros(n, dtype=np.int64)
+        self.final_lines = np.zeros(n, dtype=np.int64)
+        self.episodes = np.zeros(n, dtype=np.int64)
+        self._all = np.arange(n)
+        self._row_index = np.arange(self.rows)
+        # Flat offsets of the board's rows and columns inside one padded board
+        self._row_offsets = (self._row_index + pad) * self._width
+        self._col_offsets = np.arange(self.columns) + pad
+        self.reset(seed)
+
+    def _build_tables(self):
+        """
+        Turn the rotation patterns into arrays indexed by [shape, rotation, cell].
+        Shapes with fewer rotations or cells are padded by repeating their own entries.
+        """
+        patterns = [self.rotations[shape] for shape in self.shapes]
+        max_rotations = max(len(p) for p in patterns)
+        max_cells = max(len(offsets) for p in patterns for offsets in p)
+        offsets = np.zeros((len(patterns), max_rotations, max_cells, 2), dtype=np.intp)
+        for k, shape_patterns in enumerate(patterns):
+            for r in range(max_rotations):
+                cells = shape_patterns[r % len(shape_patterns)]
+                for c in range(max_cells):
+                    offsets[k, r, c] = cells[c % len(cells)]
+        self.offsets = offsets
+        self.rotation_count = np.array([len(p) for p in patterns], dtype=np.intp)
+        # Spawn pivot column per shape, centred like `Engine.spawn`
+        first = offsets[:, 0, :, 0]
+        span = first.max(axis=1) - first.min(axis=1) + 1
+        self.spawn_col = (self.columns - span) // 2 - first.min(axis=1)
+        self.kicks = np.array(Rotation.KICKS, dtype=np.intp)
+        # Farthest a candidate cell can land outside the board from a piece that is inside it
+        self.pad = int(np.ptp(offsets.reshape(-1, 2), axis=0).max() + np.abs(self.kicks).max() + 1)
+        self.score_table = np.array([Logic.SetScore(lines) for lines in range(max_cells + 1)], dtype=np.int64)
+
+    def reset(self, seed=0):
+        """
+        Start every game over; env `i` uses seed `seed + i`.
+        """
+        self._reset(self._all, np.uint64(seed & Engine.MASK64) + self._all.astype(np.uint64))
+
+    def _reset(self, idx, seeds=None):
+        self.boards[idx] = 0
+        if seeds is not None:
+            self.rng_state[idx] = seeds
+        self.score[idx] = 0
+        self.lines[idx] = 0
+        self.pieces[idx] = 0
+        self.ticks[idx] = 0
+        self.game_over[idx] = False
+        self._spawn(idx)
+
+    def _next_random(self, idx):
+        """
+        Advance the splitmix64 generators of `idx` and return their next values.
+        """
+        with np.errstate(over="ignore"):
+            z = self.rng_state[idx] + GOLDEN
+            self.rng_state[idx] = z
+            z = (z ^ (z >> np.uint64(30))) * MIX1
+            z = (z ^ (z >> np.uint64(27))) * MIX2
+        return z ^ (z >> np.uint64(31))
+
+    def _spawn(self, idx):
+        kind = (self._next_random(idx) % np.uint64(len(self.shapes))).astype(np.intp)
+        self.kind[idx] = kind
+        self.rotation[idx] = 0
+        self.pivot_col[idx] = self.spawn_col[kind]
+        self.pivot_row[idx] = 0
+        # A blocked spawn ends the game.
+        cols, rows = self._cells(idx)
+        self.game_over[idx[self._collides(idx, cols, rows)]] = True
+
+    def _cells(self, idx, rotation=None, dcol=0, drow=0):
+        """
+        Return (cols, rows) arrays of shape (len(idx), cells) for the active pieces of `idx`.
+        """
+        if rotation is None:
+            rotation = self.rotation[idx]
+        offsets = self.offsets[self.kind[idx], rotation]
+        cols = offsets[:, :, 0] + (self.pivot_col[idx] + dcol)[:, None]
+        rows = offsets[:, :, 1] + (self.pivot_row[idx] + drow)[:, None]
+        return cols, rows
+
+    def _flat_cells(self, idx, cols, rows):
+        pad = self.pad
+        return (idx * self._stride)[:, None] + (rows + pad) * self._width + (cols + pad)
+
+    def _collides(self, idx, cols, rows):
+        return self._flat[self._flat_cells(idx, cols, rows)].any(axis=1)
+
+    def active_cells(self):
+        """
+        Return (cols, rows) arrays of shape (n, cells) for every active piece.
+        """
+        return self._cells(self._all)
+
+    def observe(self):
+        """
+        Return a copy of the boards with the active pieces drawn in as 2.
+        """
+        obs = self.boards.copy()
+        cols, rows = self.active_cells()
+        live = ~self.game_over
+        obs[self._all[live, None], rows[live], cols[live]] = 2
+        return obs
+
+    def step(self, actions):
+        """
+        Apply one action per env (an `Engine` action code) and return (lines, done):
+        the lines each env cleared this tick and which games ended. With `auto_reset`
+        ended games are reset before returning; their results are in `final_score`/`final_lines`.
+        """
+        actions = np.broadcast_to(np.asarray(actions), (self.n,))
+        self.ticks += 1
+        lines = np.zeros(self.n, dtype=np.int64)
+        live = ~self.game_over
+
+        for action, dcol in ((Engine.LEFT, -1), (Engine.RIGHT, 1)):
+            idx = np.flatnonzero(live & (actions == action))
+            if len(idx):
+                cols, rows = self._cells(idx, dcol=dcol)
+                moved = idx[~self._collides(idx, cols, rows)]
+                self.pivot_col[moved] += dcol
+
+        for action, step in ((Engine.ROTATE_LEFT, -1), (Engine.ROTATE_RIGHT, 1)):
+            idx = np.flatnonzero(live & (actions == action))
+            if len(idx):
+                self._rotate(idx, step)
+
+        locking = []
+        idx = np.flatnonzero(live & (actions == Engine.DOWN))
+        if len(idx):
+            cols, rows = self._cells(idx, drow=1)
+            blocked = self._collides(idx, cols, rows)
+            self.pivot_row[idx[~blocked]] += 1
+            locking.append(idx[blocked])
+        idx = np.flatnonzero(live & (actions == Engine.DROP))
+        if len(idx):
+            self.pivot_row[idx] += self._drop_distance(idx)
+            locking.append(idx)
+        if locking:
+            idx = np.concatenate(locking)
+            if len(idx):
+                lines[idx] = self._lock(idx)
+
+        done = live & self.game_over
+        if self.auto_reset:
+            ended = np.flatnonzero(done)
+            if len(ended):
+                self.final_score[ended] = self.score[ended]
+                self.final_lines[ended] = self.lines[ended]
+                self.episodes[ended] += 1
+                # The next game continues each env's piece sequence.
+                self._reset(ended)
+        return lines, done
+
+    def _rotate(self, idx, step):
+        # Try the kicks in order; each env takes the first that fits, like `Engine._rotate`.
+        target = (self.rotation[idx] + step) % self.rotation_count[self.kind[idx]]
+        cols, rows = self._cells(idx, target)
+        pending = np.arange(len(idx))
+        for kx, ky in self.kicks:
+            envs = idx[pending]
+            fits = ~self._collides(envs, cols[pending] + kx, rows[pending] + ky)
+            rotated = envs[fits]
+            self.rotation[rotated] = target[pending[fits]]
+            self.pivot_col[rotated] += kx
+            self.pivot_row[rotated] += ky
+            pending = pending[~fits]
+            if not len(pending):
+                break
+
+    def _drop_distance(self, idx):
+        """
+        Return how far each active piece of `idx` falls: the smallest gap below any of its cells.
+        """
+        cols, rows = self._cells(idx)
+        # (envs, cells, rows) occupancy of each cell's column, masked to the rows below the cell
+        columns = (idx * self._stride)[:, None, None] + (cols + self.pad)[:, :, None] + self._row_offsets
+        below = self._flat[columns].astype(bool) & (self._row_index > rows[:, :, None])
+        landing = np.where(below.any(axis=2), below.argmax(axis=2), self.rows)
+        return (landing - rows - 1).min(axis=1)
+
+    def _lock(self, idx):
+        """
+        Lock the active pieces of `idx`, clear full rows, score, and spawn or end each game.
+        Return the lines cleared per env of `idx`.
+        """
+        cols, rows = self._cells(idx)
+        flat = self._flat
+        flat[self._flat_cells(idx, cols, rows)] = 1
+        # Only the rows the piece landed in can have become full.
+        starts = (idx * self._stride)[:, None] + self._row_offsets[rows]
+        touched_full = flat[starts[:, :, None] + self._col_offsets].all(axis=2)
+        full = np.zeros((len(idx), self.rows), dtype=bool)
+        full[np.arange(len(idx))[:, None], rows] = touched_full
+        cleared = full.sum(axis=1)
+        clearing = np.flatnonzero(cleared)
+        if len(clearing):
+            envs = idx[clearing]
+            boards = self.boards
+            # Stable sort puts the full rows on top in order, then they are emptied.
+            order = np.argsort(~full[clearing], axis=1, kind="stable")
+            compacted = np.take_along_axis(boards[envs], order[:, :, None], axis=1)
+            compacted[self._row_index < cleared[clearing][:, None]] = 0
+            boards[envs] = compacted
+        self.score[idx] += self.score_table[cleared]
+        self.lines[idx] += cleared
+        self.pieces[idx] += 1
+        # The game ends when the stack reaches the top rows; the others get a new piece.
+        top = (idx * self._stride)[:, None] + (self._row_offsets[:2, None] + self._col_offsets).reshape(-1)
+        topped = flat[top].any(axis=1)
+        self.game_over[idx[topped]] = True
+        self._spawn(idx[~topped])
+        return cleared
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure batched simulator throughput with random actions.")
+    parser.add_argument("--envs", "-n", type=int, default=4096)
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    env = VecEnv(args.envs, args.seed)
+    rng = np.random.default_rng(args.seed)
+    actions = rng.choice(np.array(Engine.ACTIONS), size=(args.steps, args.envs))
+    start = time.perf_counter()
+    for step_actions in actions:
+        env.step(step_actions)
+    elapsed = time.perf_counter() - start
+    result = {
+        "envs": args.envs,
+        "steps": args.steps,
+        "board_steps_per_second": args.envs * args.steps / elapsed,
+        "games_finished": int(env.episodes.sum()),
+    }
+    json.dump(result, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
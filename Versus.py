@@ -0,0 +1,575 @@
+"""
+Head-to-head play over a local asyncio server.
+
+One server process runs many matches side by side on the headless `Engine`, each
+player driven by a `Scheduler.Controller`. Clients send key presses and releases;
+every tick batch the server broadcasts only what changed on each board: the
+changed row masks, the active piece cells and the score line. Clearing lines
+sends garbage rows to an opponent.
+
+    python Versus.py serve --address 127.0.0.1:7777 --players 2
+    python Game.py --connect 127.0.0.1:7777
+    python Versus.py load --matches 200 --seconds 10   # in-process server with bot clients
+
+Addresses are `host:port` for TCP or `unix:/path` for a Unix socket.
+"""
+import argparse
+import asyncio
+import json
+import random
+import struct
+import sys
+import time
+
+import Engine
+import Scheduler
+from Engine import grid
+
+# Message types; every message is a HEADER (type, payload length) followed by its payload.
+# Client to server
+PRESS = 1
+RELEASE = 2
+PING = 3
+# Server to client
+START = 10
+STATE = 11
+END = 12
+PONG = 13
+
+HEADER = struct.Struct("<BH")
+ACTION = struct.Struct("<B")
+TIMESTAMP = struct.Struct("<d")
+# player id, player count, seed, rows, columns
+START_MSG = struct.Struct("<BBqHH")
+# player id, flags, tick, score, lines, pending garbage, changed row count; then the rows and active cells
+STATE_MSG = struct.Struct("<BBIIHHH")
+GAME_OVER_FLAG = 1
+ROW = struct.Struct("<H")
+CELL = struct.Struct("<hh")
+# winning player id, or NO_WINNER
+END_MSG = struct.Struct("<B")
+NO_WINNER = 255
+
+# Garbage rows sent for 1, 2, 3 and 4 cleared lines
+GARBAGE = (0, 0, 1, 2, 4)
+
+DEFAULT_ADDRESS = "127.0.0.1:7777"
+PLAYERS_PER_MATCH = 2
+# Pending connections queued by the listening socket; hundreds of matches may join at once.
+BACKLOG = 1024
+# Clients that fall this far behind on reading are dropped rather than buffered forever.
+MAX_WRITE_BUFFER = 1 << 20
+
+
+def parse_address(address):
+    """
+    Return ("unix", path) or ("tcp", (host, port)) for an address string.
+    """
+    if address.startswith("unix:"):
+        return "unix", address[5:]
+    host, _, port = address.rpartition(":")
+    return "tcp", (host or "127.0.0.1", int(port))
+
+
+def message(kind, payload=b""):
+    return HEADER.pack(kind, len(payload)) + payload
+
+
+async def read_message(reader):
+    """
+    Return (type, payload) of the next message, or None when the connection closed.
+    """
+    try:
+        header = await reader.readexactly(HEADER.size)
+        kind, length = HEADER.unpack(header)
+        return kind, await reader.readexactly(length)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+
+
+def decode_state(payload, columns):
+    """
+    Decode a STATE payload into (player, game_over, tick, score, lines, pending, rows, active).
+    `rows` is a list of (row, mask) and `active` a list of [col, row] cells.
+    """
+    player, flags, tick, score, lines, pending, count = STATE_MSG.unpack_from(payload)
+    width = (columns + 7) // 8
+    offset = STATE_MSG.size
+    rows = []
+    for _ in range(count):
+        (row,) = ROW.unpack_from(payload, offset)
+        offset += ROW.size
+        rows.append((row, int.from_bytes(payload[offset:offset + width], "little")))
+        offset += width
+    cells = payload[offset]
+    offset += 1
+    active = [list(CELL.unpack_from(payload, offset + i * CELL.size)) for i in range(cells)]
+    return player, bool(flags & GAME_OVER_FLAG), tick, score, lines, pending, rows, active
+
+
+class Player:
+    """
+    One connected client and its authoritative game, plus what it has already been sent.
+    """
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.id = None
+        self.match = None
+        self.engine = None
+        self.controller = None
+        self.pending_garbage = 0
+        # Board rows and piece state as last broadcast, used to build deltas.
+        self.sent_masks = None
+        self.sent_active = None
+        self.sent_header = None
+
+    def start(self, match, player_id, seed, rows, columns):
+        self.match = match
+        self.id = player_id
+        self.engine = Engine.Engine(seed, rows, columns)
+        self.controller = Scheduler.Controller(self.engine)
+        self.sent_masks = [0] * rows
+        self.sent_active = ()
+        self.sent_header = None
+
+    def delta(self):
+        """
+        Return a STATE message with what changed since the last call, or b"" if nothing did.
+        """
+        engine = self.engine
+        masks = engine.board.row_masks
+        sent = self.sent_masks
+        changed = []
+        if masks != sent:
+            for row, mask in enumerate(masks):
+                if mask != sent[row]:
+                    changed.append(row)
+                    sent[row] = mask
+        active = tuple(map(tuple, engine.active_piece_grid_pos))
+        header = (engine.score, engine.lines, self.pending_garbage, engine.game_over)
+        if not changed and active == self.sent_active and header == self.sent_header:
+            return b""
+        self.sent_active = active
+        self.sent_header = header
+
+        width = (engine.columns + 7) // 8
+        flags = GAME_OVER_FLAG if engine.game_over else 0
+        parts = [STATE_MSG.pack(self.id, flags, self.controller.tick, engine.score, engine.lines,
+                                self.pending_garbage, len(changed))]
+        for row in changed:
+            parts.append(ROW.pack(row))
+            parts.append(masks[row].to_bytes(width, "little"))
+        parts.append(bytes((len(active),)))
+        parts.extend(CELL.pack(col, row) for col, row in active)
+        return message(STATE, b"".join(parts))
+
+    def send(self, data):
+        transport = self.writer.transport
+        if transport.is_closing():
+            return
+        if transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            transport.abort()
+            return
+        self.writer.write(data)
+
+
+class Match:
+    """
+    A head-to-head game between players sharing one seed, so everyone gets the same pieces.
+    """
+
+    def __init__(self, players, seed, rows=None, columns=None):
+        self.players = players
+        self.seed = seed
+        self.rows = grid["rows"] if rows is None else rows
+        self.columns = grid["columns"] if columns is None else columns
+        # Garbage holes come from their own generator so they do not disturb the piece sequence.
+        self.rng = random.Random(seed)
+        self.finished = False
+        self.winner = None
+        for player_id, player in enumerate(players):
+            player.start(self, player_id, seed, self.rows, self.columns)
+        start = [START_MSG.pack(p.id, len(players), seed, self.rows, self.columns) for p in players]
+        for player, payload in zip(players, start):
+            player.send(message(START, payload))
+
+    def alive(self):
+        return [p for p in self.players if not p.engine.game_over]
+
+    def tick(self):
+        """
+        Run one scheduler tick for every player and route garbage from cleared lines.
+        """
+        for player in self.players:
+            engine = player.engine
+            if engine.game_over:
+                continue
+            lines = engine.lines
+            pieces = engine.pieces
+            player.controller.run_tick()
+            cleared = engine.lines - lines
+            if cleared:
+                self._send_garbage(player, GARBAGE[min(cleared, len(GARBAGE) - 1)])
+            if engine.pieces != pieces and player.pending_garbage:
+                # Garbage rises when the receiver's piece locks, never under a falling piece.
+                engine.add_garbage(player.pending_garbage, self.rng.randrange(self.columns))
+                player.pending_garbage = 0
+
+        alive = self.alive()
+        if len(alive) <= (1 if len(self.players) > 1 else 0):
+            self.finished = True
+            self.winner = alive[0] if alive else None
+
+    def _send_garbage(self, sender, count):
+        # Cleared lines first cancel garbage waiting for the sender.
+        cancelled = min(count, sender.pending_garbage)
+        sender.pending_garbage -= cancelled
+        count -= cancelled
+        if not count:
+            return
+        opponents = [p for p in self.players if p is not sender and not p.engine.game_over]
+        if opponents:
+            # The opponent with the lowest stack takes it.
+            target = max(opponents, key=lambda p: min(p.engine.board.heights))
+            target.pending_garbage += count
+
+    def flush(self):
+        """
+        Send every player the deltas of all boards since the last flush.
+        """
+        data = b"".join(p.delta() for p in self.players)
+        if self.finished:
+            winner = self.winner.id if self.winner is not None else NO_WINNER
+            data += message(END, END_MSG.pack(winner))
+        if data:
+            for player in self.players:
+                player.send(data)
+
+    def leave(self, player):
+        if not player.engine.game_over:
+            player.engine._end_game()
+
+
+class Server:
+    """
+    Pairs incoming connections into matches and runs all of them from one tick loop.
+    """
+
+    def __init__(self, players=PLAYERS_PER_MATCH, rows=None, columns=None, seed=None,
+                 tick_rate=Scheduler.TICK_RATE):
+        self.players_per_match = players
+        self.rows = rows
+        self.columns = columns
+        self.rng = random.Random(seed)
+        self.tick_rate = tick_rate
+        self.lobby = []
+        self.matches = []
+        self.finished = 0
+        self.server = None
+        self._ticker = None
+        # Open player connections and their handler tasks, so `close` can end them cleanly.
+        self.connections = {}
+
+    async def start(self, address=DEFAULT_ADDRESS):
+        kind, where = parse_address(address)
+        if kind == "unix":
+            self.server = await asyncio.start_unix_server(self._handle, where, backlog=BACKLOG)
+        else:
+            self.server = await asyncio.start_server(self._handle, *where, backlog=BACKLOG)
+        self._ticker = asyncio.ensure_future(self._tick_loop())
+        return self.server
+
+    async def close(self):
+        if self._ticker is not None:
+            self._ticker.cancel()
+        if self.server is not None:
+            self.server.close()
+        # Closing a connection ends its handler at the next read.
+        handlers = list(self.connections.values())
+        for writer in list(self.connections):
+            writer.close()
+        await asyncio.gather(*handlers, return_exceptions=True)
+        if self.server is not None:
+            await self.server.wait_closed()
+
+    async def serve_forever(self, address=DEFAULT_ADDRESS):
+        await self.start(address)
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def _handle(self, reader, writer):
+        self.connections[writer] = asyncio.current_task()
+        player = Player(writer)
+        self.lobby.append(player)
+        if len(self.lobby) >= self.players_per_match:
+            players = self.lobby[:self.players_per_match]
+            del self.lobby[:self.players_per_match]
+            self.matches.append(Match(players, self.rng.randrange(2 ** 63), self.rows, self.columns))
+        try:
+            while True:
+                msg = await read_message(reader)
+                if msg is None:
+                    break
+                kind, payload = msg
+                if kind == PING:
+                    player.send(message(PONG, payload))
+                elif player.controller is None:
+                    continue
+                elif kind in (PRESS, RELEASE):
+                    # Only playing actions are accepted; SPAWN would let a client reroll its piece.
+                    if len(payload) != ACTION.size:
+                        continue
+                    action = ACTION.unpack(payload)[0]
+                    if action not in Engine.ACTIONS:
+                        continue
+                    if kind == PRESS:
+                        player.controller.press(action)
+                    else:
+                        player.controller.release(action)
+        finally:
+            self.connections.pop(writer, None)
+            if player in self.lobby:
+                self.lobby.remove(player)
+            elif player.match is not None:
+                player.match.leave(player)
+            writer.close()
+
+    async def _tick_loop(self):
+        loop = asyncio.get_running_loop()
+        timestep = Scheduler.FixedTimestep(self.tick_rate)
+        tick_length = 1.0 / self.tick_rate
+        last = loop.time()
+        while True:
+            await asyncio.sleep(tick_length)
+            now = loop.time()
+            ticks = timestep.advance(now - last)
+            last = now
+            if not ticks:
+                continue
+            running = []
+            for match in self.matches:
+                for _ in range(ticks):
+                    if match.finished:
+                        break
+                    match.tick()
+                # One delta per player per wakeup, however many ticks it covered.
+                match.flush()
+                if match.finished:
+                    self.finished += 1
+                else:
+                    running.append(match)
+            self.matches = running
+
+
+class Client:
+    """
+    asyncio client: `on_message(kind, payload)` is called for every message from the server.
+    STATE payloads can be decoded with `decode_state` once START has given the board size.
+    """
+
+    def __init__(self, on_message=None):
+        self.on_message = on_message
+        self.reader = None
+        self.writer = None
+        self.bytes_received = 0
+
+    async def connect(self, address=DEFAULT_ADDRESS):
+        kind, where = parse_address(address)
+        if kind == "unix":
+            self.reader, self.writer = await asyncio.open_unix_connection(where)
+        else:
+            self.reader, self.writer = await asyncio.open_connection(*where)
+
+    def press(self, action):
+        self.writer.write(message(PRESS, ACTION.pack(action)))
+
+    def release(self, action):
+        self.writer.write(message(RELEASE, ACTION.pack(action)))
+
+    def ping(self):
+        self.writer.write(message(PING, TIMESTAMP.pack(time.perf_counter())))
+
+    async def run(self):
+        """
+        Read messages until the server closes the connection.
+        """
+        while True:
+            msg = await read_message(self.reader)
+            if msg is None:
+                return
+            self.bytes_received += HEADER.size + len(msg[1])
+            if self.on_message is not None:
+                self.on_message(*msg)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class ThreadedClient:
+    """
+    Runs a `Client` on a background event loop for the arcade view, which polls `events`
+    from its own loop. Presses and releases are handed to the network thread.
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS):
+        import queue
+        import threading
+        self.address = address
+        self.events = queue.Queue()
+        self.client = Client(lambda kind, payload: self.events.put((kind, payload)))
+        self.loop = asyncio.new_event_loop()
+        self._connected = threading.Event()
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name="tootris-versus", daemon=True)
+        self.thread.start()
+        self._connected.wait()
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self.client.connect(self.address))
+        except OSError as e:
+            self.error = e
+            self._connected.set()
+            return
+        self._connected.set()
+        self.loop.run_until_complete(self.client.run())
+        self.events.put((END, END_MSG.pack(NO_WINNER)))
+
+    def press(self, action):
+        self.loop.call_soon_threadsafe(self.client.press, action)
+
+    def release(self, action):
+        self.loop.call_soon_threadsafe(self.client.release, action)
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.client.close)
+
+
+class Mirror:
+    """
+    Client-side copy of one player's game, rebuilt from STATE deltas on a bare `Engine`
+    so the views can draw it (including the ghost piece) like a local game.
+    """
+
+    def __init__(self, seed, rows, columns):
+        self.engine = Engine.Engine(seed, rows, columns)
+        self.engine.active_piece_grid_pos = []
+        self.pending_garbage = 0
+        self.tick = 0
+
+    def apply(self, state):
+        _, game_over, tick, score, lines, pending, rows, active = state
+        engine = self.engine
+        engine.game_over = game_over
+        if rows:
+            engine.board.update_rows(rows)
+        engine.active_piece_grid_pos = active
+        engine.score = score
+        engine.lines = lines
+        self.pending_garbage = pending
+        self.tick = tick
+
+
+async def bot(address, stats, seconds, rate=8.0, seed=None):
+    """
+    Headless client for load tests: presses random keys `rate` times a second, pings once
+    a second and records round-trip times and bytes received into `stats`.
+    """
+    rng = random.Random(seed)
+    started = asyncio.get_running_loop().create_future()
+    ended = asyncio.get_running_loop().create_future()
+
+    def on_message(kind, payload):
+        if kind == START and not started.done():
+            started.set_result(START_MSG.unpack(payload))
+        elif kind == PONG:
+            stats["rtt"].append(time.perf_counter() - TIMESTAMP.unpack(payload)[0])
+        elif kind == END and not ended.done():
+            ended.set_result(None)
+
+    client = Client(on_message)
+    await client.connect(address)
+    reader = asyncio.ensure_future(client.run())
+    await started
+    begin = time.perf_counter()
+    deadline = begin + seconds
+    step = 1.0 / rate
+    next_ping = begin
+    while time.perf_counter() < deadline and not ended.done() and not reader.done():
+        action = rng.choice(Engine.ACTIONS[1:])
+        client.press(action)
+        client.release(action)
+        if time.perf_counter() >= next_ping:
+            client.ping()
+            next_ping += 1.0
+        await asyncio.sleep(step)
+    stats["bytes"] += client.bytes_received
+    stats["seconds"] += time.perf_counter() - begin
+    client.close()
+    reader.cancel()
+
+
+async def load_test(matches=100, players=PLAYERS_PER_MATCH, seconds=5.0, address="127.0.0.1:0"):
+    """
+    Run an in-process server with `matches` matches of bots and return latency and bandwidth figures.
+    The bots share the server's event loop, so round trips include their own scheduling too.
+    """
+    server = Server(players, seed=0)
+    listener = await server.start(address)
+    if not address.startswith("unix:"):
+        host, port = listener.sockets[0].getsockname()[:2]
+        address = f"{host}:{port}"
+    stats = {"rtt": [], "bytes": 0, "seconds": 0.0}
+    try:
+        results = await asyncio.gather(*(bot(address, stats, seconds, seed=i) for i in range(matches * players)),
+                                       return_exceptions=True)
+    finally:
+        await server.close()
+    errors = [r for r in results if isinstance(r, BaseException)]
+    rtt = sorted(stats["rtt"]) or [0.0]
+    clients = matches * players
+    return {
+        "matches": matches,
+        "players": players,
+        "errors": len(errors),
+        "rtt_p50_ms": rtt[len(rtt) // 2] * 1000,
+        "rtt_p99_ms": rtt[min(len(rtt) - 1, int(len(rtt) * 0.99))] * 1000,
+        "bytes_per_client_per_second": stats["bytes"] / max(stats["seconds"], 1e-9),
+        "bytes_per_match_per_second": stats["bytes"] / max(stats["seconds"], 1e-9) * clients / matches,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tootris versus server and load test.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="run a versus server")
+    serve.add_argument("--address", default=DEFAULT_ADDRESS, help="host:port or unix:/path")
+    serve.add_argument("--players", type=int, default=PLAYERS_PER_MATCH, help="players per match")
+    serve.add_argument("--rows", type=int, help="board height")
+    serve.add_argument("--columns", type=int, help="board width")
+    load = commands.add_parser("load", help="run an in-process server against bot clients")
+    load.add_argument("--address", default="127.0.0.1:0", help="host:port or unix:/path")
+    load.add_argument("--matches", type=int, default=100)
+    load.add_argument("--players", type=int, default=PLAYERS_PER_MATCH)
+    load.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        server = Server(args.players, args.rows, args.columns)
+        try:
+            asyncio.run(server.serve_forever(args.address))
+        except KeyboardInterrupt:
+            pass
+    else:
+        result = asyncio.run(load_test(args.matches, args.players, args.seconds, args.address))
+        json.dump(result, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
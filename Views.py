@@ -0,0 +1,731 @@
+"""
+Arcade views for Tootris: start screen, game, replay and game over.
+
+Importing this module loads arcade and pyglet, so it is only imported once a
+window is opened; see `Game.py` for the entry points.
+"""
+import atexit
+import os
+
+from pyglet.graphics import Batch
+# Import the arcade library for game development
+import arcade
+import AI
+import Engine
+import Game
+import Perf
+import Replay
+import Scheduler
+import Scoreboard
+import Trace
+import Versus
+from Engine import grid
+from Game import WINDOW_WIDTH, WINDOW_HEIGHT, EMPTY_COLOR, ACTIVE_COLOR, LOCKED_COLOR, GHOST_COLOR
+
+# Keys mapped to engine actions; the scheduler applies them on the next tick
+MOVE_KEYS = {
+    arcade.key.A: Engine.LEFT,
+    arcade.key.LEFT: Engine.LEFT,
+    arcade.key.D: Engine.RIGHT,
+    arcade.key.RIGHT: Engine.RIGHT,
+    arcade.key.S: Engine.DOWN,
+    arcade.key.DOWN: Engine.DOWN,
+    arcade.key.Q: Engine.ROTATE_LEFT,
+    arcade.key.E: Engine.ROTATE_RIGHT,
+    arcade.key.SPACE: Engine.DROP,
+}
+
+class StartScreen(arcade.View):
+    """
+    Start screen view for the game.
+    """
+
+    def __init__(self, config=None):
+        super().__init__()
+        self.background_color = Game.BACKGROUND_COLOR
+        # Grid config for the game started from this screen; None uses the default board.
+        self.config = config
+        # Read the leaderboard now so the game-over screen never waits on the file.
+        Scoreboard.get_scoreboard().load()
+        self.title_pos = (WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2 + 50)
+        self.instruction_pos = (WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2 - 50)
+        # Labels are laid out once and drawn from a persistent batch.
+        self.text_batch = Batch()
+        self.title_text = arcade.Text("Tootris", self.title_pos[0], self.title_pos[1],
+                                      arcade.color.WHITE, font_size=50, anchor_x="center", batch=self.text_batch)
+        self.instruction_text = arcade.Text("Press P to Play", self.instruction_pos[0], self.instruction_pos[1],
+                                            arcade.color.WHITE, font_size=30, anchor_x="center",
+                                            batch=self.text_batch)
+    def on_draw(self) -> bool | None:
+        self.clear()
+        self.text_batch.draw()
+    def on_key_press(self, symbol: int, modifiers: int) -> bool | None:
+        if symbol == arcade.key.P:
+            Game.main(self.config)
+
+class TootrisGame(arcade.View):
+    """
+    Main game view containing the game rendering, controls and block movements.
+    """
+
+    def __init__(self, seed=None, record_path=None, config=None):
+        super().__init__()
+        # Set background color
+        self.background_color = Game.BACKGROUND_COLOR
+
+        # Board size and layout, see `Game.make_grid`; boards taller than the window scroll.
+        self.grid = grid if config is None else config
+        self.visible_rows = Game.visible_rows(self.grid)
+        # First board row shown at the top of the viewport
+        self.view_top = 0
+
+        # All game rules and state live in the headless engine; this view renders it.
+        self.engine = Engine.Engine(seed, self.grid["rows"], self.grid["columns"])
+
+        # Logic runs at a fixed tick rate with gravity levels, DAS/ARR input and lock delay.
+        self.controller = Scheduler.Controller(self.engine, on_action=self._record)
+        # With a record path, the game's action stream is saved there as a replay when it ends.
+        self.record_path = record_path
+        self.recorder = None
+        self.saved_state = None
+        # Finished games go on the leaderboard; replays do not.
+        self.submit_score = True
+
+        # AI autoplay, toggled with I
+        self.autoplay = False
+        self.ai = None
+        self._ai_plan = []
+        self._ai_piece = None
+        if record_path:
+            self.recorder = Replay.Recorder(self.engine.seed, self.engine.rows, self.engine.columns)
+        # Set TOOTRIS_TRACE to a file path to keep an event trace of the game.
+        self.trace_path = os.environ.get("TOOTRIS_TRACE")
+        if self.trace_path:
+            self.engine.tracer = Trace.Tracer()
+            self.engine.tracer.start_flush(self.trace_path)
+
+        self.grid_pos = []
+        self.setup_grid_pos()
+
+        self.score_top_left_pos = (WINDOW_WIDTH - 620, WINDOW_HEIGHT - 40)
+
+        self.build_board_sprites()
+
+        # Persistent score label; its text is only updated when the score changes.
+        self.text_batch = Batch()
+        self._shown_score = self.score
+        self.score_text = arcade.Text(f"Score: {self.score}", *self.score_top_left_pos, batch=self.text_batch)
+
+        # Frame timing; F3 toggles the overlay and TOOTRIS_PERF=<path> dumps the samples on exit.
+        self.profiler = Perf.FrameProfiler()
+        self.show_perf = False
+        self._perf_overlay_updated = 0
+        self.perf_batch = Batch()
+        self.perf_text = arcade.Text("", WINDOW_WIDTH - 10, WINDOW_HEIGHT - 10, arcade.color.YELLOW,
+                                     font_size=9, anchor_x="right", anchor_y="top", multiline=True,
+                                     width=WINDOW_WIDTH - 20, align="right", batch=self.perf_batch)
+        perf_path = os.environ.get("TOOTRIS_PERF")
+        if perf_path:
+            atexit.register(self.profiler.dump, perf_path)
+
+        self.game_started = True
+
+    @property
+    def board(self):
+        return self.engine.board
+
+    # The game state lives on the engine; these properties keep the view's old attributes
+    # readable and assignable.
+    @property
+    def active_piece_grid_pos(self):
+        """
+            Active piece cells: list of [col, row]; empty list means no active piece.
+        """
+        return self.engine.active_piece_grid_pos
+
+    @active_piece_grid_pos.setter
+    def active_piece_grid_pos(self, cells):
+        self.engine.active_piece_grid_pos = cells
+
+    @property
+    def inactive_pieces(self):
+        """
+            Locked cells as a list of tuples in the (collumn, row) format.
+        """
+        return self.engine.inactive_pieces
+
+    @inactive_pieces.setter
+    def inactive_pieces(self, cells):
+        self.engine.board.set_cells(cells)
+
+    @property
+    def current_piece_shape(self):
+        return self.engine.current_piece_shape
+
+    @current_piece_shape.setter
+    def current_piece_shape(self, shape):
+        self.engine.current_piece_shape = shape
+
+    @property
+    def score(self):
+        return self.engine.score
+
+    @score.setter
+    def score(self, value):
+        self.engine.score = value
+
+    @property
+    def game_over(self):
+        return self.engine.game_over
+
+    @game_over.setter
+    def game_over(self, value):
+        self.engine.game_over = value
+
+    def setup_grid_pos(self):
+        # Only the drawn rows get positions, so large boards stay cheap to set up.
+        self.grid_pos = []
+        for col in range(self.grid["columns"]):
+            row_list = []
+            for row in range(self.visible_rows):
+                row_list.append((col, row))
+            self.grid_pos.append(row_list)
+
+    def get_grid_dimensions(self):
+        """
+            Simple function to compute the total width and height of the grid in pixels.
+        """
+        return Game.grid_dimensions(self.grid)
+
+    def get_cell_center(self, col, row):
+        """
+            Calculate the bottom-left pixel coordinates of a cell given its grid position.
+        """
+        return Game.cell_origin(col, row, self.grid)
+
+    def get_board_rect(self):
+        """
+            Return the board background rectangle as (left, bottom, width, height) in pixels.
+        """
+        return Game.board_rect(self.grid)
+
+    def get_cell_rect(self, col, row):
+        """
+            Return the drawn rectangle of a cell as (left, bottom, width, height) in pixels.
+        """
+        return Game.cell_rect(col, row, self.grid)
+
+    def build_board_sprites(self):
+        """
+            Build the board once as a sprite list: background, margin area and one sprite per drawn cell.
+            Cell colours are updated in place by `sync_board_sprites`.
+        """
+        rows = self.visible_rows
+        cols = self.grid["columns"]
+        m = self.grid["margin"]
+
+        def rect_sprite(left, bottom, width, height, color):
+            return arcade.SpriteSolidColor(width, height, left + width / 2, bottom + height / 2, color)
+
+        self.board_sprites = arcade.SpriteList()
+        board_left, board_bottom, total_w, total_h = self.get_board_rect()
+        # Board background
+        self.board_sprites.append(rect_sprite(board_left, board_bottom, total_w, total_h,
+                                              Game.BOARD_COLOR))
+        # Margin area
+        self.board_sprites.append(rect_sprite(board_left + m, board_bottom + m, total_w - 2 * m,
+                                              total_h - 2 * m, Game.MARGIN_COLOR))
+        # Cells of the viewport, indexed as (row - view_top) * columns + col
+        self.cell_sprites = []
+        for row in range(rows):
+            for col in range(cols):
+                sprite = rect_sprite(*self.get_cell_rect(col, row), EMPTY_COLOR)
+                self.cell_sprites.append(sprite)
+                self.board_sprites.append(sprite)
+
+        # What the sprites currently show, used to find the cells that changed.
+        self._shown_masks = [0] * rows
+        self._shown_active = ()
+        self._shown_ghost = ()
+        self._shown_top = 0
+        # Landing cells of the active piece, cached by board version and active-piece list.
+        self._ghost = []
+        self._ghost_key = None
+
+    def ghost_cells(self):
+        """
+            Return the active piece's landing cells, recomputed only when the piece or the board changed.
+            The engine replaces its active-piece list on every move and the board counts its changes,
+            so changes below the viewport are caught too.
+        """
+        active = self.active_piece_grid_pos
+        key = self._ghost_key
+        if key is None or key[0] is not active or key[1] != self.board.version:
+            self._ghost = self.engine.ghost_cells()
+            self._ghost_key = (active, self.board.version)
+        return self._ghost
+
+    def _cell_color(self, col, row):
+        return LOCKED_COLOR if self.board.is_occupied(col, row) else EMPTY_COLOR
+
+    def scroll_to_active_piece(self, ghost=None):
+        """
+            Scroll the viewport, only when needed, to show the active piece and where it will land
+            (or the stack top between pieces), and return the first row shown. When the piece is
+            too far above its landing spot for both to fit, the viewport follows the piece.
+            `ghost` is the landing cells when the caller already has them.
+        """
+        rows = self.engine.rows
+        visible = self.visible_rows
+        if visible >= rows:
+            return 0
+        active = self.active_piece_grid_pos
+        if active:
+            focus_top = min(r for _, r in active)
+            if ghost is None:
+                ghost = self.ghost_cells()
+            focus_bottom = max(r for _, r in ghost)
+        else:
+            focus_top = focus_bottom = min(self.board.heights)
+        top = self.view_top
+        if focus_bottom - focus_top < visible:
+            if focus_top >= top and focus_bottom < top + visible:
+                return top
+            top = (focus_top + focus_bottom - visible) // 2
+        else:
+            if top <= focus_top < top + visible * 3 // 4:
+                return top
+            top = focus_top - visible // 4
+        self.view_top = top = min(max(top, 0), rows - visible)
+        return top
+
+    def sync_board_sprites(self):
+        """
+            Recolour only the drawn cells whose state changed since the last frame.
+            Only the rows in the viewport are looked at, so the cost does not grow with the board.
+        """
+        cols = self.grid["columns"]
+        sprites = self.cell_sprites
+        landing = self.ghost_cells()
+        top = self.scroll_to_active_piece(landing)
+        bottom = top + self.visible_rows
+        masks = self.board.row_masks[top:bottom]
+        shown = self._shown_masks
+        board_changed = masks != shown
+        if board_changed:
+            for row, mask in enumerate(masks):
+                changed = mask ^ shown[row]
+                if not changed:
+                    continue
+                col = 0
+                while changed:
+                    if changed & 1:
+                        sprites[row * cols + col].color = LOCKED_COLOR if (mask >> col) & 1 else EMPTY_COLOR
+                    changed >>= 1
+                    col += 1
+                shown[row] = mask
+
+        # Active and ghost cells are kept in viewport rows. The ghost also moves in the viewport when a
+        # scroll follows the piece, or when rows below the viewport change, so it is compared too.
+        active = tuple((c, r - top) for c, r in self.active_piece_grid_pos if top <= r < bottom)
+        ghost = tuple((c, r - top) for c, r in landing if top <= r < bottom)
+        if (board_changed or top != self._shown_top or active != self._shown_active
+                or ghost != self._shown_ghost):
+            for col, row in self._shown_active + self._shown_ghost:
+                sprites[row * cols + col].color = self._cell_color(col, row + top)
+            for col, row in ghost:
+                sprites[row * cols + col].color = GHOST_COLOR
+            for col, row in active:
+                sprites[row * cols + col].color = ACTIVE_COLOR
+            self._shown_active = active
+            self._shown_ghost = ghost
+            self._shown_top = top
+
+    def draw_grid(self):
+        """
+            Draw the whole board, including active and locked pieces, in one sprite list draw call.
+        """
+        self.sync_board_sprites()
+        self.board_sprites.draw()
+
+    def draw_score(self):
+        """
+        Draw the current score on the screen.
+        """
+        # Only re-layout the label when the score actually changed
+        if self.score != self._shown_score:
+            self._shown_score = self.score
+            self.score_text.text = f"Score: {self.score}"
+        self.text_batch.draw()
+    def reset(self, seed=None):
+        """
+        Start a new game in place. The engine board, scheduler, recorder, sprites and labels are
+        all reused; the sprites and score label catch up with the empty board on the next draw.
+        """
+        self.engine.reset(seed)
+        self.controller.reset()
+        self.saved_state = None
+        self._ai_plan = []
+        self._ai_piece = None
+        if self.recorder is not None:
+            self.recorder.reset(self.engine.seed)
+        tracer = self.engine.tracer
+        if tracer is not None:
+            tracer.clear()
+            tracer.start_flush(self.trace_path)
+        self.game_started = True
+
+    def draw_perf_overlay(self):
+        """
+        Draw the frame timing overlay, refreshing its text twice a second.
+        """
+        t = Perf.now_ns()
+        if t - self._perf_overlay_updated >= 500_000_000:
+            self._perf_overlay_updated = t
+            self.perf_text.text = self.profiler.overlay_text()
+        self.perf_batch.draw()
+
+    def on_draw(self):
+        # Render the screen, timing each phase.
+        profiler = self.profiler
+        profiler.frame()
+        t0 = Perf.now_ns()
+        self.clear()
+        self.draw_grid()
+        t1 = Perf.now_ns()
+        self.draw_score()
+        t2 = Perf.now_ns()
+        profiler.add("draw_grid", t1 - t0)
+        profiler.add("draw_score", t2 - t1)
+        profiler.add("draw", t2 - t0)
+        if self.show_perf:
+            self.draw_perf_overlay()
+
+    def on_update(self, delta_time):
+        t0 = Perf.now_ns()
+        self.update_game(delta_time)
+        self.profiler.add("update", Perf.now_ns() - t0)
+
+    @property
+    def tick(self):
+        return self.controller.tick
+
+    def _record(self, tick, action):
+        if self.recorder is not None:
+            self.recorder.record(tick, action)
+
+    def apply(self, action):
+        """
+        Step the engine with one action at the current tick, recording it when a replay is being recorded.
+        """
+        self.controller.step(action)
+
+    def snapshot(self):
+        """
+        Return the engine snapshot followed by the tick scheduler state.
+        """
+        return self.engine.snapshot() + self.controller.snapshot()
+
+    def restore(self, data):
+        """
+        Restore a state saved by `snapshot`; the board sprites catch up on the next draw.
+        """
+        split = len(data) - Scheduler.STATE.size
+        self.engine.restore(data[:split])
+        self.controller.restore(data, split)
+
+    def end_game(self):
+        if self.engine.tracer is not None:
+            self.engine.tracer.stop_flush()
+        if self.recorder is not None:
+            self.recorder.save(self.record_path)
+        Game.game_over(self.score, self.engine.lines, self.tick / Scheduler.TICK_RATE, self.submit_score)
+
+    def update_game(self, delta_time):
+        # The engine flags game over when a piece locks into the top rows; no board scan here.
+        if self.game_started and self.engine.game_over:
+            self.end_game()
+            return
+        # Run the logic ticks due for this frame; gravity and held keys are handled per tick.
+        if self.autoplay:
+            for _ in range(self.controller.timestep.advance(delta_time)):
+                self.autoplay_step()
+                self.controller.run_tick()
+        else:
+            self.controller.update(delta_time)
+
+    def autoplay_step(self):
+        """
+        Let the placement AI play one action per tick, planning once per piece.
+        """
+        if self.engine.game_over:
+            return
+        if self._ai_piece != self.engine.pieces:
+            self._ai_piece = self.engine.pieces
+            self._ai_plan = self.ai.plan(self.engine)
+            self._ai_plan.reverse()
+        if self._ai_plan:
+            self.apply(self._ai_plan.pop())
+
+    def on_key_press(self, key, modifiers):
+        # Movement keys are handed to the scheduler, which applies them on the next tick
+        # and auto-repeats them while held.
+        action = MOVE_KEYS.get(key)
+        if action is not None:
+            if not self.autoplay:
+                self.controller.press(action)
+        # Restart the game in place on P key press
+        elif key == arcade.key.P:
+            self.reset()
+        # Toggle AI autoplay
+        elif key == arcade.key.I:
+            self.autoplay = not self.autoplay
+            if self.ai is None:
+                self.ai = AI.PlacementAI()
+            self._ai_piece = None
+        # Toggle the frame timing overlay
+        elif key == arcade.key.F3:
+            self.show_perf = not self.show_perf
+        # Quick save and quick load; loading is disabled while recording a replay.
+        elif key == arcade.key.F5:
+            self.saved_state = self.snapshot()
+        elif key == arcade.key.F9:
+            if self.saved_state is not None and not self.record_path:
+                self.restore(self.saved_state)
+
+    def on_key_release(self, key, modifiers):
+        action = MOVE_KEYS.get(key)
+        if action is not None:
+            self.controller.release(action)
+
+    def spawn(self, kind=None):
+        self.engine.spawn(kind)
+
+    def rotate_left(self):
+        """
+        Rotate the active piece left using `block_rotations` and a tracked pivot.
+        """
+        self.apply(Engine.ROTATE_LEFT)
+
+    def rotate_right(self):
+        """
+        Rotate the active piece right using `block_rotations` and a tracked pivot.
+        """
+        self.apply(Engine.ROTATE_RIGHT)
+
+    def move_right(self):
+        # Move active piece right if possible
+        self.apply(Engine.RIGHT)
+
+    def move_left(self):
+        # Move active piece left if possible
+        self.apply(Engine.LEFT)
+
+    def move_down(self):
+        """
+        Move active piece down; if blocked, lock into inactive and clear full rows.
+        """
+        self.apply(Engine.DOWN)
+
+    def drop(self):
+        """
+        Hard drop: move down until blocked, then lock.
+        """
+        self.apply(Engine.DROP)
+
+
+    def on_mouse_motion(self, x, y, dx, dy):
+        pass
+
+    def on_mouse_press(self, x, y, button, key_modifiers):
+        pass
+
+    def on_mouse_release(self, x, y, button, key_modifiers):
+        pass
+
+
+class ReplayView(TootrisGame):
+    """
+    Plays a recorded `Replay.Replay` back at real speed. Keyboard input is ignored apart from F3.
+    """
+
+    def __init__(self, replay):
+        super().__init__(seed=replay.seed, config=Game.make_grid(replay.rows, replay.columns))
+        self.replay = replay
+        self.submit_score = False
+        self._next_record = 0
+
+    def reset(self, seed=None):
+        # A replay always restarts from its recorded seed.
+        super().reset(self.replay.seed)
+        self._next_record = 0
+
+    def update_game(self, delta_time):
+        if self.engine.game_over or self._next_record >= len(self.replay):
+            self.end_game()
+            return
+        # Only the scheduler's clock is used; gravity and input come from the recorded stream.
+        self.controller.tick += self.controller.timestep.advance(delta_time)
+        ticks = self.replay.ticks
+        actions = self.replay.actions
+        i = self._next_record
+        while i < len(actions) and ticks[i] <= self.tick:
+            self.engine.step(actions[i])
+            i += 1
+        self._next_record = i
+
+    def on_key_press(self, key, modifiers):
+        if key == arcade.key.F3:
+            self.show_perf = not self.show_perf
+
+
+class VersusView(TootrisGame):
+    """
+    Plays a match on a `Versus` server. The server runs the game; this view sends key presses
+    and releases and draws the board rebuilt from the server's deltas, with the opponents beside it.
+    """
+
+    def __init__(self, client, start):
+        player_id, players, seed, rows, columns = start
+        super().__init__(seed=seed, config=Game.make_grid(rows, columns))
+        self.client = client
+        self.player_id = player_id
+        self.submit_score = False
+        self.mirrors = [Versus.Mirror(seed, rows, columns) for _ in range(players)]
+        # Draw this player's mirrored game in place of the local engine.
+        self.engine = self.mirrors[player_id].engine
+        self.winner = None
+        self.finished = False
+        self.opponents_text = arcade.Text("", WINDOW_WIDTH - 10, WINDOW_HEIGHT - 60, arcade.color.WHITE,
+                                          font_size=12, anchor_x="right", anchor_y="top", multiline=True,
+                                          width=180, align="right", batch=self.text_batch)
+
+    @property
+    def tick(self):
+        return self.mirrors[self.player_id].tick
+
+    def update_game(self, delta_time):
+        if self.finished:
+            return
+        events = self.client.events
+        changed = False
+        while not events.empty():
+            kind, payload = events.get_nowait()
+            if kind == Versus.STATE:
+                state = Versus.decode_state(payload, self.engine.columns)
+                self.mirrors[state[0]].apply(state)
+                changed = True
+            elif kind == Versus.END:
+                winner = Versus.END_MSG.unpack(payload)[0]
+                self.winner = None if winner == Versus.NO_WINNER else winner
+                self.finished = True
+        if changed:
+            self.opponents_text.text = "\n".join(
+                f"P{i + 1}: {m.engine.score:>6}  +{m.pending_garbage}" + ("  out" if m.engine.game_over else "")
+                for i, m in enumerate(self.mirrors) if i != self.player_id
+            )
+        if self.finished:
+            self.end_game()
+
+    def end_game(self):
+        self.client.close()
+        title = "You Win" if self.winner == self.player_id else "Game Over"
+        Game.game_over(self.score, self.engine.lines, self.tick / Scheduler.TICK_RATE, False, title)
+
+    def on_key_press(self, key, modifiers):
+        action = MOVE_KEYS.get(key)
+        if action is not None:
+            self.client.press(action)
+        elif key == arcade.key.F3:
+            self.show_perf = not self.show_perf
+
+    def on_key_release(self, key, modifiers):
+        action = MOVE_KEYS.get(key)
+        if action is not None:
+            self.client.release(action)
+
+
+class WaitingScreen(arcade.View):
+    """
+    Shown while the server waits for enough players to start a match.
+    """
+
+    def __init__(self, client):
+        super().__init__()
+        self.background_color = Game.BACKGROUND_COLOR
+        self.client = client
+        self.text_batch = Batch()
+        self.waiting_text = arcade.Text("Waiting for opponents...", WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2,
+                                        arcade.color.WHITE, font_size=30, anchor_x="center",
+                                        batch=self.text_batch)
+
+    def on_draw(self):
+        self.clear()
+        self.text_batch.draw()
+
+    def on_update(self, delta_time):
+        # Later messages stay queued for the versus view.
+        events = self.client.events
+        while not events.empty():
+            kind, payload = events.get_nowait()
+            if kind == Versus.START:
+                self.window.show_view(VersusView(self.client, Versus.START_MSG.unpack(payload)))
+                return
+            if kind == Versus.END:
+                Game.game_over(0, submit=False, title="Disconnected")
+                return
+
+
+class TootrisGameOver(arcade.View):
+    """
+    Game Over view to display when the game ends.
+    """
+
+    def __init__(self, final_score=0, lines=0, duration=0.0, submit=True, title="Game Over"):
+        super().__init__()
+        self.background_color = Game.BACKGROUND_COLOR
+
+        # Labels are laid out once and drawn from a persistent batch; `show_result` only changes their text.
+        self.text_batch = Batch()
+        self.game_over_text = arcade.Text("Game Over", WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2 + 50,
+                                          arcade.color.WHITE, font_size=50, anchor_x="center",
+                                          batch=self.text_batch)
+        self.score_text = arcade.Text("", WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2,
+                                      arcade.color.WHITE, font_size=30, anchor_x="center", batch=self.text_batch)
+        self.high_score_text = arcade.Text("", WINDOW_WIDTH / 2,
+                                           WINDOW_HEIGHT / 2 - 50, arcade.color.WHITE, font_size=30,
+                                           anchor_x="center", batch=self.text_batch)
+        self.leaderboard_text = arcade.Text("", WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2 - 100,
+                                            arcade.color.LIGHT_GRAY, font_size=14, anchor_x="center",
+                                            anchor_y="top", multiline=True, width=WINDOW_WIDTH - 100,
+                                            align="center", batch=self.text_batch)
+        self.instruction_text = arcade.Text("Press P to Play Again", WINDOW_WIDTH / 2, 80,
+                                            arcade.color.WHITE, font_size=20, anchor_x="center",
+                                            batch=self.text_batch)
+        self.show_result(final_score, lines, duration, submit, title)
+
+    def show_result(self, final_score, lines=0, duration=0.0, submit=True, title="Game Over"):
+        """
+        Submit a finished game to the leaderboard and show it, reusing the existing labels.
+        """
+        self.final_score = final_score or 0
+        # The leaderboard is cached in memory and written on a background thread.
+        scores = Scoreboard.get_scoreboard()
+        self.rank = scores.submit(self.final_score, lines, duration) if submit else None
+        self.high_score = scores.high_score
+        leaderboard = "\n".join(
+            f"{i + 1:>2}. {entry['score']:>7}  {entry['lines']:>4} lines  {entry['date'][:10]}"
+            for i, entry in enumerate(scores.load()[:5])
+        )
+        self.game_over_text.text = title
+        self.score_text.text = f"Final Score: {self.final_score}"
+        self.high_score_text.text = f"High Score: {self.high_score}"
+        self.leaderboard_text.text = leaderboard
+
+    def on_draw(self):
+        self.clear()
+        self.text_batch.draw()
+
+    def on_key_press(self, key, modifiers):
+        if key == arcade.key.P:
+            Game.main()
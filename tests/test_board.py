@@ -0,0 +1,31 @@
+from Board import Board
+
+
+def test_every_change_bumps_version():
+    board = Board(20, 10)
+    data = board.to_bytes()
+    changes = [
+        lambda: board.lock([(col, 19) for col in range(10)]),
+        lambda: board.clear_full_rows(),
+        lambda: board.add_garbage(2, 3),
+        lambda: board.update_rows([(5, 1)]),
+        lambda: board.load_bytes(data),
+        lambda: board.set_cells([(0, 19)]),
+        lambda: board.clear(),
+    ]
+    for change in changes:
+        version = board.version
+        change()
+        assert board.version > version
+
+
+def test_reads_keep_version():
+    board = Board(20, 10)
+    board.lock([(0, 19), (1, 19)])
+    version = board.version
+    board.full_rows()
+    board.cells()
+    board.collides([(0, 18)])
+    board.drop_distance([(2, 0)])
+    board.clear_full_rows()
+    assert board.version == version
@@ -0,0 +1,21 @@
+import copy
+
+import Engine
+import Rotation
+
+
+def test_equal_rotation_sets_share_one_table():
+    first = Rotation.rotation_table(copy.deepcopy(Engine.block_rotations))
+    size = len(Rotation._tables)
+    for _ in range(10):
+        assert Rotation.rotation_table(copy.deepcopy(Engine.block_rotations)) is first
+    assert len(Rotation._tables) == size
+
+
+def test_changed_rotation_set_gets_a_new_table():
+    rotations = copy.deepcopy(Engine.block_rotations)
+    before = Rotation.rotation_table(rotations)
+    rotations["O"] = [[(0, 0), (1, 0)]]
+    after = Rotation.rotation_table(rotations)
+    assert after is not before
+    assert after["O"][0][0][1][0][2] == ((0, 0), (1, 0))
@@ -0,0 +1,44 @@
+import Engine
+import Scheduler
+
+
+def test_tap_between_ticks_moves_once():
+    engine = Engine.Engine(0)
+    controller = Scheduler.Controller(engine)
+    col = engine.rotation_origin[0]
+    controller.press(Engine.LEFT)
+    controller.release(Engine.LEFT)
+    for _ in range(30):
+        controller.run_tick()
+    assert engine.rotation_origin[0] == col - 1
+    assert controller.held == {}
+    assert controller.shift is None
+
+
+def test_held_key_repeats_until_released():
+    engine = Engine.Engine(0)
+    controller = Scheduler.Controller(engine, das=10, arr=2)
+    col = engine.rotation_origin[0]
+    controller.press(Engine.RIGHT)
+    for _ in range(12):
+        controller.run_tick()
+    controller.release(Engine.RIGHT)
+    for _ in range(10):
+        controller.run_tick()
+    # One move on press, then auto-repeats on ticks 10 and 12 (DAS, then every ARR ticks).
+    assert engine.rotation_origin[0] == col + 3
+    assert controller.held == {}
+
+
+def test_held_soft_drop_waits_for_lock_delay():
+    engine = Engine.Engine(0)
+    controller = Scheduler.Controller(engine, lock_delay=30)
+    controller.press(Engine.DOWN)
+    landed_at = None
+    while engine.pieces == 0:
+        controller.run_tick()
+        if landed_at is None and not engine._can_move(0, 1):
+            landed_at = controller.tick
+    # Holding DOWN after landing does not lock early; the lock delay, which counts the landing
+    # tick as its first, does.
+    assert controller.tick - landed_at == 30 - 1
@@ -0,0 +1,19 @@
+import json
+
+import Scoreboard
+
+
+def test_failed_write_keeps_writer_alive(tmp_path):
+    board = Scoreboard.Scoreboard(str(tmp_path / "missing" / "score.json"))
+    board.submit(10)
+    assert not board.flush(timeout=5)
+    board.submit(20)
+    assert not board.flush(timeout=5)
+    assert board._writer.is_alive()
+
+    # Once the directory exists the next write succeeds.
+    (tmp_path / "missing").mkdir()
+    board.submit(30)
+    assert board.flush(timeout=5)
+    with open(board.path) as f:
+        assert [e["score"] for e in json.load(f)["leaderboard"]] == [30, 20, 10]
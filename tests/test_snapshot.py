@@ -0,0 +1,61 @@
+import random
+
+import Engine
+import Scheduler
+import Selfplay
+
+
+def engine_state(engine):
+    # Shape, rotation and pivot only mean something while there is an active piece.
+    piece = ()
+    if engine.active_piece_grid_pos:
+        piece = (engine.current_piece_shape, engine.current_rotation_index, engine.rotation_origin)
+    return (engine.active_piece_grid_pos, piece, engine.game_over, engine.score, engine.lines, engine.pieces,
+            engine.ticks, engine.rng_state, engine.board.row_masks, engine.board.heights)
+
+
+def test_snapshot_size():
+    assert len(Engine.Engine(0).snapshot()) == 56
+
+
+def test_restore_continues_identically():
+    rng = random.Random(0)
+    for seed, policy in ((1, "random"), (2, "greedy"), (3, "greedy")):
+        engine = Engine.Engine(seed)
+        play = Selfplay.POLICIES[policy](seed)
+        copy = Engine.Engine(seed + 1000)
+        while not engine.game_over:
+            engine.step(play(engine))
+            if rng.random() < 0.05:
+                data = engine.snapshot()
+                # An engine with another seed and board takes on the whole state, RNG included,
+                # and then plays on exactly like the original.
+                copy.restore(data)
+                assert engine_state(copy) == engine_state(engine)
+                assert copy.snapshot() == data
+                for _ in range(20):
+                    action = play(engine)
+                    assert copy.step(action) == engine.step(action)
+                    assert engine_state(copy) == engine_state(engine)
+        # The finished game, without an active piece, round-trips too.
+        copy.restore(engine.snapshot())
+        assert engine_state(copy) == engine_state(engine)
+        assert engine.pieces > 10
+
+
+def test_controller_snapshot_round_trip():
+    engine = Engine.Engine(5)
+    controller = Scheduler.Controller(engine)
+    for _ in range(100):
+        controller.update(1 / 60)
+    data = engine.snapshot() + controller.snapshot()
+    split = len(data) - Scheduler.STATE.size
+
+    other = Scheduler.Controller(Engine.Engine(6))
+    other.engine.restore(data[:split])
+    other.restore(data, split)
+    assert other.snapshot() == controller.snapshot()
+    for _ in range(300):
+        controller.run_tick()
+        other.run_tick()
+    assert engine_state(other.engine) == engine_state(engine)
@@ -0,0 +1,53 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import Engine  # noqa: E402
+import Selfplay  # noqa: E402
+import VecEnv  # noqa: E402
+
+
+def assert_lockstep(policy, n, seed, steps, rows=None, columns=None):
+    """
+    Step `VecEnv(n, seed)` and `Engine(seed + i)` with the same actions and compare them after every step.
+    Actions come from `Selfplay.POLICIES[policy]` playing each engine.
+    """
+    env = VecEnv.VecEnv(n, seed, rows, columns, auto_reset=False)
+    engines = [Engine.Engine(seed + i, rows, columns) for i in range(n)]
+    policies = [Selfplay.POLICIES[policy](seed + i) for i in range(n)]
+    for step in range(steps):
+        actions = [play(engine) for play, engine in zip(policies, engines)]
+        lines, done = env.step(np.array(actions))
+        cols, cell_rows = env.active_cells()
+        for i, engine in enumerate(engines):
+            was_over = engine.game_over
+            assert lines[i] == engine.step(actions[i]), (i, step)
+            assert env.game_over[i] == engine.game_over, (i, step)
+            # `done` only flags the step on which a game ended.
+            assert done[i] == (engine.game_over and not was_over), (i, step)
+            assert env.score[i] == engine.score and env.lines[i] == engine.lines, (i, step)
+            assert env.pieces[i] == engine.pieces, (i, step)
+            board = np.zeros((engine.rows, engine.columns), dtype=np.uint8)
+            for col, row in engine.board.cells():
+                board[row, col] = 1
+            assert (env.boards[i] == board).all(), (i, step)
+            if not engine.game_over:
+                active = set(zip(cols[i].tolist(), cell_rows[i].tolist()))
+                assert active == {tuple(cell) for cell in engine.active_piece_grid_pos}, (i, step)
+    return env
+
+
+def test_random_actions_match_engine():
+    assert_lockstep("random", 32, 0, 1500)
+
+
+def test_greedy_play_matches_engine():
+    # Greedy play clears lines, so row compaction and scoring are covered too.
+    env = assert_lockstep("greedy", 8, 100, 1500)
+    assert env.lines.sum() > 0
+
+
+def test_other_board_sizes_match_engine():
+    env = assert_lockstep("greedy", 8, 200, 1000, rows=30, columns=13)
+    assert env.lines.sum() > 0
+    assert_lockstep("random", 8, 300, 1000, rows=12, columns=6)
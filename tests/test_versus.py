@@ -0,0 +1,51 @@
+import asyncio
+
+import Engine
+import Versus
+
+
+async def _match_with_bad_input():
+    server = Versus.Server(seed=0)
+    listener = await server.start("127.0.0.1:0")
+    host, port = listener.sockets[0].getsockname()[:2]
+    address = f"{host}:{port}"
+    started = [asyncio.Event(), asyncio.Event()]
+    pong = asyncio.Event()
+
+    def on_message(index):
+        def handle(kind, payload):
+            if kind == Versus.START:
+                started[index].set()
+            elif kind == Versus.PONG:
+                pong.set()
+        return handle
+
+    clients = [Versus.Client(on_message(i)) for i in range(2)]
+    readers = []
+    for client in clients:
+        await client.connect(address)
+        readers.append(asyncio.ensure_future(client.run()))
+    for event in started:
+        await asyncio.wait_for(event.wait(), 5)
+
+    # A piece reroll and malformed payloads are ignored without dropping the connection.
+    writer = clients[0].writer
+    writer.write(Versus.message(Versus.PRESS, Versus.ACTION.pack(Engine.SPAWN)))
+    writer.write(Versus.message(Versus.PRESS, b""))
+    writer.write(Versus.message(Versus.RELEASE, b"\x01\x02"))
+    clients[0].ping()
+    await asyncio.wait_for(pong.wait(), 5)
+
+    players = server.matches[0].players
+    assert players[0].controller.inputs == []
+    # Neither player pressed a valid key, so both games are still identical.
+    assert players[0].engine.snapshot() == players[1].engine.snapshot()
+
+    await server.close()
+    assert server.connections == {}
+    for reader in readers:
+        await asyncio.wait_for(reader, 5)
+
+
+def test_server_ignores_spawn_and_malformed_input():
+    asyncio.run(_match_with_bad_input())